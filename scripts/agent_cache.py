@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of agent outputs.
+
+An agent call is fingerprinted by the agent .mdc file, the persona files,
+the input documents and the model. Re-running an agent on unchanged
+inputs returns the stored output instead of paying for another call.
+
+Usage:
+    python scripts/agent_cache.py --agent agents/critique-agent.mdc --input outputs/drafts/draft_5_intro_v2.md
+    python scripts/agent_cache.py --agent agents/critique-agent.mdc --input outputs/drafts/draft_5_intro_v2.md \\
+        --store outputs/critiques/critique_5_intro_20251120.md --input-tokens 40000 --output-tokens 3000
+    python scripts/agent_cache.py --stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from cost_tracker import CostTracker
+from hashing import hash_file
+
+DEFAULT_PERSONA_FILES = [
+    "persona/PERSONA.md",
+    "persona/writing-voice.md",
+    "persona/resources/professional_persona_prompts.json",
+]
+
+
+def agent_model(agent_path):
+    """Read the model: field from an agent .mdc frontmatter."""
+    content = Path(agent_path).read_text(encoding="utf-8")
+    match = re.search(r'^model:\s*"?([^"\n]+)"?\s*$', content, re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+class AgentCache:
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.objects = self.cache_dir / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self._file_hashes = {}
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        # Entries are kept least-recently-used first
+        return {"entries": {}, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0, "saved_usage": {}}
+
+    def save(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _hash(self, path):
+        # Persona files are shared by every call; hash each once per run
+        path = Path(path)
+        stat = path.stat()
+        key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+        if key not in self._file_hashes:
+            self._file_hashes[key] = hash_file(path)
+        return self._file_hashes[key]
+
+    def fingerprint(self, agent_path, persona_paths, input_paths, model, messages=None):
+        """
+        Key for one agent call.
+
+        Paths are hashed by content, so renaming or touching a file does
+        not invalidate the cache but any edit does. messages (the system
+        and user text actually sent) are hashed too when given, so calls
+        that differ only in their prompt get different keys.
+        """
+        parts = {
+            "agent": self._hash(agent_path),
+            "persona": [self._hash(p) for p in persona_paths],
+            "inputs": [self._hash(p) for p in input_paths],
+            "model": model,
+        }
+        if messages is not None:
+            parts["messages"] = [hashlib.sha256(m.encode("utf-8")).hexdigest() for m in messages]
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _object_path(self, key):
+        return self.objects / key[:2] / key
+
+    def get(self, key):
+        """Return the cached output for key, or None on a miss."""
+        entry = self.index["entries"].pop(key, None)
+        if entry is None or not self._object_path(key).exists():
+            if entry is not None:
+                self.index["bytes"] -= entry["size"]
+            self.index["misses"] += 1
+            return None
+
+        # Move to the most-recently-used end
+        self.index["entries"][key] = entry
+        self.index["hits"] += 1
+        if entry.get("model") and entry.get("usage"):
+            saved = self.index["saved_usage"].setdefault(entry["model"], {})
+            # Every hit saves one call, as in CostTracker.add_record
+            usage = dict(entry["usage"])
+            usage.setdefault("requests", 1)
+            for usage_key, amount in usage.items():
+                saved[usage_key] = saved.get(usage_key, 0) + amount
+        return self._object_path(key).read_text(encoding="utf-8")
+
+    def put(self, key, output, model=None, usage=None):
+        """
+        Store an agent output.
+
+        usage ({"input_tokens": ..., "output_tokens": ...} and/or
+        {"requests": ...}) is what the call cost; each later hit counts
+        it as saved. A model is only charged for the units it is priced in.
+        """
+        data = output.encode("utf-8")
+        path = self._object_path(key)
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(data)
+
+        old = self.index["entries"].pop(key, None)
+        if old is not None:
+            self.index["bytes"] -= old["size"]
+        self.index["entries"][key] = {"size": len(data), "model": model, "usage": usage or {}}
+        self.index["bytes"] += len(data)
+        self._evict()
+
+    def _evict(self):
+        entries = self.index["entries"]
+        while self.index["bytes"] > self.max_bytes and len(entries) > 1:
+            key = next(iter(entries))
+            entry = entries.pop(key)
+            self.index["bytes"] -= entry["size"]
+            self.index["evictions"] += 1
+            try:
+                self._object_path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for key in list(self.index["entries"]):
+            try:
+                self._object_path(key).unlink()
+            except FileNotFoundError:
+                pass
+        self.index = {"entries": {}, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0, "saved_usage": {}}
+
+    def report(self, tracker=None):
+        """
+        Hit/miss counts and the dollars saved by hits, priced by CostTracker.
+        
+        Usage of models missing from CostTracker.COSTS cannot be priced; it
+        is listed under "unpriced" rather than silently counted as $0.
+        """
+        tracker = tracker or CostTracker()
+        saved_usage = self.index["saved_usage"]
+        lookups = self.index["hits"] + self.index["misses"]
+        return {
+            "entries": len(self.index["entries"]),
+            "bytes": self.index["bytes"],
+            "hits": self.index["hits"],
+            "misses": self.index["misses"],
+            "hit_rate": self.index["hits"] / lookups if lookups else 0,
+            "evictions": self.index["evictions"],
+            "saved": tracker.estimate_monthly(
+                {model: usage for model, usage in saved_usage.items() if model in tracker.COSTS}
+            ),
+            "unpriced": {model: usage for model, usage in saved_usage.items() if model not in tracker.COSTS},
+        }
+
+
+def print_report(report):
+    print("=== Agent Cache ===")
+    print(f"Entries: {report['entries']} ({report['bytes'] / 1024:.1f} KB)")
+    print(f"Hits: {report['hits']}  Misses: {report['misses']}  Hit rate: {report['hit_rate']:.1%}")
+    print(f"Evictions: {report['evictions']}")
+    print(f"Saved: ${report['saved']['total']}")
+    for model, cost in report["saved"]["breakdown"].items():
+        print(f"  {model}: ${cost}")
+    for model, usage in report["unpriced"].items():
+        amounts = ", ".join(f"{value:,} {unit.replace('_', ' ')}" for unit, value in usage.items())
+        print(f"  {model}: not priced ({amounts} saved); add it to CostTracker.COSTS")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Look up or store agent outputs keyed by agent, persona, inputs and model"
+    )
+    parser.add_argument("--agent", help="Agent .mdc file")
+    parser.add_argument("--input", action="append", default=[], help="Input document (repeatable)")
+    parser.add_argument(
+        "--persona",
+        action="append",
+        help="Persona file (repeatable, default: PERSONA.md, writing-voice.md, professional_persona_prompts.json)"
+    )
+    parser.add_argument("--model", help="Model (default: model: from the agent file)")
+    parser.add_argument("--store", help="Output file to record for this call")
+    parser.add_argument("--input-tokens", type=int, default=0, help="Input tokens the stored call used")
+    parser.add_argument("--output-tokens", type=int, default=0, help="Output tokens the stored call used")
+    parser.add_argument("--requests", type=int, default=0, help="Requests the stored call used (request-priced models such as perplexity)")
+    parser.add_argument("--max-mb", type=float, default=200, help="Cache size limit in MB (default: 200)")
+    parser.add_argument("--stats", action="store_true", help="Print hit/miss and savings report")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached outputs")
+
+    args = parser.parse_args()
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    cache = AgentCache(workspace / "outputs" / "cache", max_bytes=int(args.max_mb * 1024 * 1024))
+
+    if args.clear:
+        cache.clear()
+        cache.save()
+        print("Cache cleared")
+        return 0
+
+    if args.stats:
+        print_report(cache.report())
+        return 0
+
+    if not args.agent:
+        parser.error("--agent is required for lookups and stores")
+
+    persona = args.persona or [workspace / p for p in DEFAULT_PERSONA_FILES]
+    persona = [p for p in persona if Path(p).exists()]
+    model = args.model or agent_model(args.agent)
+    key = cache.fingerprint(args.agent, persona, args.input, model)
+
+    if args.store:
+        usage = {}
+        if args.input_tokens or args.output_tokens:
+            usage = {"input_tokens": args.input_tokens, "output_tokens": args.output_tokens}
+        if args.requests:
+            usage["requests"] = args.requests
+        cache.put(key, Path(args.store).read_text(encoding="utf-8"), model=model, usage=usage)
+        cache.save()
+        print(f"Stored: {args.store} ({key[:12]})")
+        return 0
+
+    output = cache.get(key)
+    cache.save()
+    if output is None:
+        print(f"MISS: {key[:12]}", file=sys.stderr)
+        return 1
+    sys.stdout.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,40 +4,95 @@ Extract and analyze code blocks from the document.
 Identifies code blocks with their section headings for validation.
 """
 
+import argparse
 import re
 import sys
 from collections import defaultdict
 
-def extract_code_blocks_with_headers(filepath):
-    """Extract all code blocks with their section headings."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+from profiling import PROFILER, add_profile_arguments, start_profiling, finish_profiling, start_worker_profiling
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+)$')
+
+def update_heading_stack(heading_stack, line):
+    """
+    Push a heading line onto the stack of (hashes, text) pairs.
     
-    lines = content.split('\n')
+    Headings at the same or deeper level are popped first, so the stack
+    always holds the path from the top-level heading to this one.
+    Returns True if the line was a heading.
+    """
+    heading_match = HEADING_PATTERN.match(line)
+    if not heading_match:
+        return False
     
-    # Find all headings (##, ###, ####, etc.)
-    headings = []
-    current_heading_stack = []
+    level = len(heading_match.group(1))
+    text = heading_match.group(2).strip()
+    
+    while heading_stack and len(heading_stack[-1][0]) >= level:
+        heading_stack.pop()
+    heading_stack.append((heading_match.group(1), text))
+    return True
+
+def heading_path(heading_stack):
+    """Render a heading stack as 'Chapter > Section > Subsection'."""
+    return ' > '.join([h[1] for h in heading_stack]) if heading_stack else 'No heading'
+
+def iter_sections(lines):
+    """
+    Yield markdown sections one at a time, one per heading.
+    
+    Each section runs from its heading line up to the next heading of any
+    level; text before the first heading is a 'No heading' section.
+    '#' lines inside fenced code are code, not headings, so a section never
+    splits a code block. lines may be any iterable, so a file can be streamed.
+    """
+    heading_stack = []
+    in_code_block = False
+    current = {'heading_path': 'No heading', 'level': 0, 'start_line': 1, 'lines': []}
+    
+    for i, line in enumerate(lines, 1):
+        if line.startswith('```'):
+            in_code_block = not in_code_block
+        elif not in_code_block and HEADING_PATTERN.match(line):
+            if current['lines']:
+                current['end_line'] = i - 1
+                yield current
+            update_heading_stack(heading_stack, line)
+            current = {
+                'heading_path': heading_path(heading_stack),
+                'level': len(heading_stack[-1][0]),
+                'start_line': i,
+                'lines': []
+            }
+        current['lines'].append(line)
+    
+    if current['lines']:
+        current['end_line'] = current['start_line'] + len(current['lines']) - 1
+        yield current
+
+def split_sections(lines):
+    """Split markdown lines into a list of flat sections (see iter_sections)."""
+    return list(iter_sections(lines))
+
+def extract_code_blocks_from_lines(lines, first_line=1, heading_stack=None):
+    """
+    Extract code blocks from a run of lines starting at line first_line.
+    
+    heading_stack is the stack in effect before the first line (see
+    update_heading_stack), so a slice of a document outside any code block
+    gives the same blocks, with the same line numbers and heading paths,
+    as the whole document does. As in iter_sections, '#' lines inside a
+    code block (shell or Python comments) are code, not headings.
+    """
+    current_heading_stack = list(heading_stack or [])
     
     code_blocks = []
     in_code_block = False
     code_block_start = None
     code_block_language = None
     code_block_lines = []
-    code_block_heading = None
     
-    for i, line in enumerate(lines, 1):
-        # Track headings
-        heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
-        if heading_match:
-            level = len(heading_match.group(1))
-            text = heading_match.group(2).strip()
-            
-            # Maintain heading stack
-            while current_heading_stack and len(current_heading_stack[-1][0]) >= level:
-                current_heading_stack.pop()
-            current_heading_stack.append((heading_match.group(1), text))
-        
+    for i, line in enumerate(lines, first_line):
         # Track code blocks
         if line.startswith('```'):
             if in_code_block:
@@ -48,7 +103,7 @@ def extract_code_blocks_with_headers(filepath):
                     'language': code_block_language,
                     'content': '\n'.join(code_block_lines),
                     'line_count': len(code_block_lines),
-                    'heading_path': ' > '.join([h[1] for h in current_heading_stack]) if current_heading_stack else 'No heading',
+                    'heading_path': heading_path(current_heading_stack),
                     'section_heading': current_heading_stack[-1][1] if current_heading_stack else 'No heading'
                 })
                 in_code_block = False
@@ -58,13 +113,24 @@ def extract_code_blocks_with_headers(filepath):
                 in_code_block = True
                 code_block_start = i
                 code_block_language = line[3:].strip() or 'plain'
-                if code_block_language:
-                    code_block_heading = current_heading_stack[-1][1] if current_heading_stack else 'No heading'
         elif in_code_block:
             code_block_lines.append(line)
+        else:
+            # Track headings (##, ###, ####, etc.)
+            update_heading_stack(current_heading_stack, line)
     
     return code_blocks
 
+def extract_code_blocks_with_headers(filepath):
+    """Extract all code blocks with their section headings."""
+    with PROFILER.phase('read') as phase:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        phase.nbytes = len(content)
+    
+    with PROFILER.phase('tokenize', nbytes=len(content)):
+        return extract_code_blocks_from_lines(content.split('\n'))
+
 def analyze_code_block(block):
     """Analyze a code block for code smells and issues."""
     issues = []
@@ -73,151 +139,221 @@ def analyze_code_block(block):
     
     # Check for Python code blocks specifically
     if block['language'] == 'python':
-        # Extract function definitions
-        functions = []
-        current_function = None
-        current_function_start = None
-        indent_level = 0
-        
-        for i, line in enumerate(lines, 1):
-            # Find function/class definitions
-            func_match = re.match(r'^(\s*)(def|class)\s+(\w+)', line)
-            if func_match:
-                if current_function:
-                    # Save previous function
-                    functions.append({
-                        'name': current_function['name'],
-                        'start': current_function_start,
-                        'end': i - 1,
-                        'line_count': i - current_function_start,
-                        'indent': current_function['indent']
-                    })
+        with PROFILER.phase('rule:function_scan', nbytes=len(content)):
+            # Extract function definitions
+            functions = []
+            current_function = None
+            current_function_start = None
+            indent_level = 0
+            
+            for i, line in enumerate(lines, 1):
+                # Find function/class definitions
+                func_match = re.match(r'^(\s*)(def|class)\s+(\w+)', line)
+                if func_match:
+                    if current_function:
+                        # Save previous function
+                        functions.append({
+                            'name': current_function['name'],
+                            'start': current_function_start,
+                            'end': i - 1,
+                            'line_count': i - current_function_start,
+                            'indent': current_function['indent']
+                        })
+                    
+                    current_function = {
+                        'name': func_match.group(3),
+                        'type': func_match.group(2),
+                        'indent': len(func_match.group(1))
+                    }
+                    current_function_start = i
                 
-                current_function = {
-                    'name': func_match.group(3),
-                    'type': func_match.group(2),
-                    'indent': len(func_match.group(1))
-                }
-                current_function_start = i
+                # Check for docstrings
+                if current_function and '"""' in line:
+                    if current_function.get('has_docstring'):
+                        # End of docstring
+                        pass
+                    else:
+                        current_function['has_docstring'] = True
             
-            # Check for docstrings
-            if current_function and '"""' in line:
-                if current_function.get('has_docstring'):
-                    # End of docstring
-                    pass
-                else:
-                    current_function['has_docstring'] = True
-        
-        # Don't forget last function
-        if current_function:
-            functions.append({
-                'name': current_function['name'],
-                'start': current_function_start,
-                'end': len(lines),
-                'line_count': len(lines) - current_function_start + 1,
-                'indent': current_function['indent']
-            })
+            # Don't forget last function
+            if current_function:
+                functions.append({
+                    'name': current_function['name'],
+                    'start': current_function_start,
+                    'end': len(lines),
+                    'line_count': len(lines) - current_function_start + 1,
+                    'indent': current_function['indent']
+                })
         
         # Analyze functions
         for func in functions:
-            # Check function length (smell if > 50 lines)
-            if func['line_count'] > 50:
-                issues.append({
-                    'type': 'long_function',
-                    'severity': 'medium',
-                    'message': f"Function '{func['name']}' is {func['line_count']} lines long (consider refactoring if > 50 lines)",
-                    'location': f"lines {func['start']}-{func['end']}"
-                })
+            with PROFILER.phase('rule:long_function'):
+                # Check function length (smell if > 50 lines)
+                if func['line_count'] > 50:
+                    issues.append({
+                        'type': 'long_function',
+                        'severity': 'medium',
+                        'message': f"Function '{func['name']}' is {func['line_count']} lines long (consider refactoring if > 50 lines)",
+                        'location': f"lines {func['start']}-{func['end']}"
+                    })
+            
+            with PROFILER.phase('rule:missing_docstring'):
+                # Check for docstrings (should have one)
+                func_content = '\n'.join(lines[func['start']-1:func['end']])
+                if 'def ' in func_content and '"""' not in func_content[:200]:
+                    issues.append({
+                        'type': 'missing_docstring',
+                        'severity': 'low',
+                        'message': f"Function '{func['name']}' is missing a docstring",
+                        'location': f"line {func['start']}"
+                    })
+        
+        with PROFILER.phase('rule:low_comment_ratio'):
+            # Check for comments
+            comment_lines = sum(1 for line in lines if line.strip().startswith('#') or '"""' in line or "'''" in line)
+            total_lines = len([l for l in lines if l.strip()])
+            comment_ratio = comment_lines / total_lines if total_lines > 0 else 0
             
-            # Check for docstrings (should have one)
-            func_content = '\n'.join(lines[func['start']-1:func['end']])
-            if 'def ' in func_content and '"""' not in func_content[:200]:
+            if comment_ratio < 0.1 and len(lines) > 10:
                 issues.append({
-                    'type': 'missing_docstring',
+                    'type': 'low_comment_ratio',
                     'severity': 'low',
-                    'message': f"Function '{func['name']}' is missing a docstring",
-                    'location': f"line {func['start']}"
+                    'message': f"Low comment ratio ({comment_ratio:.1%}), code may benefit from more explanatory comments",
+                    'location': 'throughout'
                 })
         
-        # Check for comments
-        comment_lines = sum(1 for line in lines if line.strip().startswith('#') or '"""' in line or "'''" in line)
-        total_lines = len([l for l in lines if l.strip()])
-        comment_ratio = comment_lines / total_lines if total_lines > 0 else 0
-        
-        if comment_ratio < 0.1 and len(lines) > 10:
-            issues.append({
-                'type': 'low_comment_ratio',
-                'severity': 'low',
-                'message': f"Low comment ratio ({comment_ratio:.1%}), code may benefit from more explanatory comments",
-                'location': 'throughout'
-            })
-        
         # Check for obvious bugs or anti-patterns
         full_content = '\n'.join(lines)
         
-        # Check for undefined variables (common issues)
-        if 'calculate_burn_rate_for_window' in full_content and 'def calculate_burn_rate_for_window' not in full_content:
-            issues.append({
-                'type': 'undefined_method',
-                'severity': 'high',
-                'message': "Method 'calculate_burn_rate_for_window' is called but not defined in this class",
-                'location': 'see calls to calculate_burn_rate_for_window'
-            })
+        with PROFILER.phase('rule:undefined_method'):
+            # Check for undefined variables (common issues)
+            if 'calculate_burn_rate_for_window' in full_content and 'def calculate_burn_rate_for_window' not in full_content:
+                issues.append({
+                    'type': 'undefined_method',
+                    'severity': 'high',
+                    'message': "Method 'calculate_burn_rate_for_window' is called but not defined in this class",
+                    'location': 'see calls to calculate_burn_rate_for_window'
+                })
+            
+            if 'get_threshold' in full_content and 'def get_threshold' not in full_content:
+                issues.append({
+                    'type': 'undefined_method',
+                    'severity': 'high',
+                    'message': "Method 'get_threshold' is called but not defined in this class",
+                    'location': 'see calls to get_threshold'
+                })
         
-        if 'get_threshold' in full_content and 'def get_threshold' not in full_content:
-            issues.append({
-                'type': 'undefined_method',
-                'severity': 'high',
-                'message': "Method 'get_threshold' is called but not defined in this class",
-                'location': 'see calls to get_threshold'
-            })
+        with PROFILER.phase('rule:missing_import'):
+            # Check for undefined imports
+            if 'statistics.' in full_content and 'import statistics' not in full_content:
+                issues.append({
+                    'type': 'missing_import',
+                    'severity': 'medium',
+                    'message': "Uses 'statistics' module but doesn't import it",
+                    'location': 'throughout'
+                })
         
-        # Check for undefined imports
-        if 'statistics.' in full_content and 'import statistics' not in full_content:
+        with PROFILER.phase('rule:division_check'):
+            # Check for division by zero potential
+            if '/' in full_content and 'if.*== 0' not in full_content:
+                # Check if there's division without zero checks
+                if re.search(r'/\s*\w+', full_content) and not re.search(r'if.*==\s*0|if.*!=.*0|if\s+\w+\s*:', full_content):
+                    # This is a weak check, but flag for review
+                    pass
+    
+    with PROFILER.phase('rule:long_code_block'):
+        # Check for very long code blocks (could indicate need for refactoring)
+        if block['line_count'] > 100:
             issues.append({
-                'type': 'missing_import',
+                'type': 'long_code_block',
                 'severity': 'medium',
-                'message': "Uses 'statistics' module but doesn't import it",
-                'location': 'throughout'
+                'message': f"Code block is {block['line_count']} lines long (consider breaking into smaller, more focused examples)",
+                'location': f"lines {block['start_line']}-{block['end_line']}"
             })
-        
-        # Check for division by zero potential
-        if '/' in full_content and 'if.*== 0' not in full_content:
-            # Check if there's division without zero checks
-            if re.search(r'/\s*\w+', full_content) and not re.search(r'if.*==\s*0|if.*!=.*0|if\s+\w+\s*:', full_content):
-                # This is a weak check, but flag for review
-                pass
-    
-    # Check for very long code blocks (could indicate need for refactoring)
-    if block['line_count'] > 100:
-        issues.append({
-            'type': 'long_code_block',
-            'severity': 'medium',
-            'message': f"Code block is {block['line_count']} lines long (consider breaking into smaller, more focused examples)",
-            'location': f"lines {block['start_line']}-{block['end_line']}"
-        })
     
     return issues
 
-def main():
-    filepath = '/Users/geoffwhite/Documents/SLOBlackSwan-Cursor/input/SLOBLACKSWAN-v0.44.md'
+def shard_manuscript(lines, level=None):
+    """
+    Split manuscript lines at top-level headings into independent shards.
     
-    print("Extracting code blocks...")
-    blocks = extract_code_blocks_with_headers(filepath)
+    Returns (first_line, lines, heading_stack) tuples, where heading_stack
+    is the stack in effect before the shard's first line, so each shard can
+    be passed to extract_code_blocks_from_lines on its own. Shards only
+    start at headings outside code blocks. level defaults to the
+    shallowest heading level that occurs more than once (the chapters).
+    """
+    candidates = []
+    heading_stack = []
+    in_code_block = False
+    for i, line in enumerate(lines):
+        if line.startswith('#') and not in_code_block:
+            heading_match = HEADING_PATTERN.match(line)
+            if heading_match:
+                candidates.append((i, len(heading_match.group(1)), list(heading_stack)))
+                update_heading_stack(heading_stack, line)
+        elif line.startswith('```'):
+            in_code_block = not in_code_block
     
-    print(f"Found {len(blocks)} code blocks\n")
+    if level is None:
+        levels = sorted({lvl for _, lvl, _ in candidates})
+        level = next((l for l in levels if sum(1 for _, lvl, _ in candidates if lvl <= l) > 1), 1)
     
-    # Analyze each block
-    all_issues = []
-    blocks_with_issues = []
+    starts = [(i, stack) for i, lvl, stack in candidates if lvl <= level]
+    if not starts or starts[0][0] != 0:
+        starts.insert(0, (0, []))
+    ends = [i for i, _ in starts[1:]] + [len(lines)]
+    return [(start + 1, lines[start:end], stack) for (start, stack), end in zip(starts, ends)]
+
+def analyze_shard(shard):
+    """Worker: extract and analyze one shard; returns [(block, issues)]."""
+    first_line, lines, heading_stack = shard
+    return [
+        (block, analyze_code_block(block))
+        for block in extract_code_blocks_from_lines(lines, first_line, heading_stack)
+    ]
+
+def analyze_shard_profiled(shard):
+    """Worker: analyze_shard, plus the (stats, events) profiled for this shard."""
+    return analyze_shard(shard), PROFILER.take()
+
+def analyze_parallel(filepath, workers=None, level=None):
+    """
+    Extract and analyze a manuscript chapter by chapter in worker processes.
     
-    for block in blocks:
-        issues = analyze_code_block(block)
-        if issues:
-            blocks_with_issues.append((block, issues))
-            all_issues.extend([(block, issue) for issue in issues])
+    Returns ([(block, issues)] in document order, number of shards); the
+    blocks are identical to those of extract_code_blocks_with_headers.
+    When profiling, the rule phases timed in the workers are merged into
+    PROFILER, so their totals are CPU time summed over all workers.
+    """
+    # Imported here: multiprocessing is slow to load and the default run is serial
+    from concurrent.futures import ProcessPoolExecutor
     
-    # Output results
+    with PROFILER.phase('read') as phase:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        phase.nbytes = len(content)
+    
+    with PROFILER.phase('shard', nbytes=len(content)):
+        shards = shard_manuscript(content.split('\n'), level)
+    
+    with PROFILER.phase('analyze', nbytes=len(content)):
+        if not PROFILER.enabled:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = [pair for shard_result in pool.map(analyze_shard, shards) for pair in shard_result]
+            return results, len(shards)
+        
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=start_worker_profiling,
+                                 initargs=(PROFILER.keep_events,)) as pool:
+            for shard_result, (stats, events) in pool.map(analyze_shard_profiled, shards):
+                results.extend(shard_result)
+                PROFILER.merge(stats, events)
+    return results, len(shards)
+
+DEFAULT_MANUSCRIPT = '/Users/geoffwhite/Documents/SLOBlackSwan-Cursor/input/SLOBLACKSWAN-v0.44.md'
+
+def print_report(blocks, blocks_with_issues, all_issues):
     print("=" * 80)
     print("CODE BLOCK VALIDATION REPORT")
     print("=" * 80)
@@ -288,5 +424,65 @@ def main():
     else:
         print("\nNo code blocks require urgent refactoring.")
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract code blocks with their headings and report code smells"
+    )
+    parser.add_argument(
+        'filepath',
+        nargs='?',
+        default=DEFAULT_MANUSCRIPT,
+        help='Manuscript markdown file (default: SLOBLACKSWAN-v0.44.md)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Analyze chapters in parallel in this many processes; 0 uses every CPU (default: 1, serial)'
+    )
+    parser.add_argument(
+        '--shard-level',
+        type=int,
+        help='With --workers, split at headings of this level or above (default: shallowest repeated level)'
+    )
+    add_profile_arguments(parser)
+    
+    args = parser.parse_args()
+    start_profiling(args)
+    filepath = args.filepath
+    
+    all_issues = []
+    blocks_with_issues = []
+    
+    if args.workers != 1:
+        print("Extracting and analyzing code blocks by chapter...")
+        results, shard_count = analyze_parallel(filepath, args.workers or None, args.shard_level)
+        blocks = [block for block, _ in results]
+        print(f"Found {len(blocks)} code blocks in {shard_count} shards\n")
+        
+        for block, issues in results:
+            if issues:
+                blocks_with_issues.append((block, issues))
+                all_issues.extend([(block, issue) for issue in issues])
+    else:
+        print("Extracting code blocks...")
+        blocks = extract_code_blocks_with_headers(filepath)
+        
+        print(f"Found {len(blocks)} code blocks\n")
+        
+        # Analyze each block
+        with PROFILER.phase('analyze'):
+            for block in blocks:
+                issues = analyze_code_block(block)
+                if issues:
+                    blocks_with_issues.append((block, issues))
+                    all_issues.extend([(block, issue) for issue in issues])
+    
+    # Output results
+    with PROFILER.phase('report'):
+        print_report(blocks, blocks_with_issues, all_issues)
+    
+    finish_profiling(args)
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Benchmark the manuscript scripts against synthetic books.
+
+Generates a realistic workspace (manuscript, agent .mdc files and an
+outputs/ tree of drafts, research notes and images) at several scales,
+times each script's core function and records throughput and peak memory
+in a JSON baseline that later runs can be compared against.
+
+Usage:
+    python scripts/benchmark.py
+    python scripts/benchmark.py --scales 1,10 --repeat 5
+    python scripts/benchmark.py --compare outputs/benchmarks/benchmark_20251120.json
+    python scripts/benchmark.py --generate-only /tmp/synthetic_book --scales 10
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from analyze_code_blocks import extract_code_blocks_with_headers, analyze_code_block
+from check_line_lengths import check_line_lengths
+from organize_outputs import OutputOrganizer
+from post_process_markdown_headers import process_markdown_file
+from validate_mdc import validate_file
+
+WORDS = (
+    "error budget burn rate latency availability incident outage tail risk "
+    "black swan reliability service level objective indicator alert page "
+    "on-call postmortem dependency failure cascade capacity traffic"
+).split()
+
+LANGUAGES = ["python", "python", "python", "yaml", "bash", "json", ""]
+
+
+class ManuscriptGenerator:
+    """
+    Build synthetic book workspaces.
+
+    At scale 1 the manuscript has `chapters` chapters; every other
+    quantity (drafts, notes, images, agent files) grows with the scale.
+    """
+
+    def __init__(self, seed=42, chapters=5, sections=6, heading_depth=4,
+                 code_density=0.4, paragraphs=4):
+        self.rng = random.Random(seed)
+        self.chapters = chapters
+        self.sections = sections
+        self.heading_depth = heading_depth
+        self.code_density = code_density
+        self.paragraphs = paragraphs
+
+    def sentence(self, words=14):
+        text = " ".join(self.rng.choice(WORDS) for _ in range(words))
+        return text.capitalize() + "."
+
+    def paragraph(self):
+        return " ".join(self.sentence(self.rng.randint(8, 20)) for _ in range(self.rng.randint(2, 5)))
+
+    def python_block(self):
+        lines = []
+        for f in range(self.rng.randint(1, 3)):
+            name = f"calculate_{self.rng.choice(WORDS).replace('-', '_')}_{f}"
+            lines.append(f"def {name}(events, window):")
+            if self.rng.random() < 0.6:
+                lines.append('    """Compute the value over a rolling window."""')
+            for i in range(self.rng.choice([3, 8, 20, 60])):
+                if self.rng.random() < 0.15:
+                    lines.append(f"    # Step {i}: {self.sentence(6)}")
+                elif self.rng.random() < 0.05:
+                    lines.append("    threshold = self.get_threshold(window)")
+                else:
+                    lines.append(f"    value_{i} = sum(e.{self.rng.choice(WORDS).replace('-', '_')} for e in events) / max(window, 1)")
+            lines.append("    return value_0")
+            lines.append("")
+        return lines
+
+    def code_block(self):
+        language = self.rng.choice(LANGUAGES)
+        if language == "python":
+            body = self.python_block()
+        elif language == "yaml":
+            body = [f"{w}: {self.rng.randint(1, 999)}" for w in self.rng.sample(WORDS, 6)]
+        elif language == "bash":
+            body = [f"kubectl get {self.rng.choice(WORDS)} -n production --watch" for _ in range(3)]
+        elif language == "json":
+            body = ["{", f'  "{self.rng.choice(WORDS)}": {self.rng.random():.4f}', "}"]
+        else:
+            body = [self.sentence(10) for _ in range(3)]
+        return [f"```{language}"] + body + ["```"]
+
+    def manuscript(self, scale=1):
+        lines = ["# SLOs Can't Catch a Black Swan", "", self.paragraph(), ""]
+        for ch in range(1, self.chapters * scale + 1):
+            lines += [f"## Chapter {ch}: {self.sentence(4)[:-1]}", "", self.paragraph(), ""]
+            for sec in range(1, self.sections + 1):
+                level = self.rng.randint(3, max(3, min(6, self.heading_depth + 2)))
+                lines += ["#" * level + f" {ch}.{sec} {self.sentence(3)[:-1]}", ""]
+                for _ in range(self.paragraphs):
+                    lines += [self.paragraph(), ""]
+                    if self.rng.random() < self.code_density:
+                        lines += self.code_block() + [""]
+        return "\n".join(lines) + "\n"
+
+    def draft(self, chapter, section):
+        lines = [f"# {chapter}.{section} {self.sentence(3)[:-1]}", ""]
+        for _ in range(self.paragraphs * 2):
+            lines += [self.paragraph(), ""]
+            if self.rng.random() < self.code_density:
+                lines += self.code_block() + [""]
+        return "\n".join(lines) + "\n"
+
+    def agent_file(self, n):
+        return "\n".join([
+            "---",
+            "alwaysApply: true",
+            "---",
+            f'name: "Synthetic Agent {n}"',
+            f'model: "{self.rng.choice(["claude-sonnet-4", "gpt-4o", "gemini-2.5-pro"])}"',
+            f'description: "{self.sentence(8)}"',
+            'type: ["Writing"]',
+            "tools:",
+            "  all: false",
+            "---",
+            "",
+            f"# Agent {n} Instructions",
+            "",
+            self.paragraph(),
+            "",
+            "```markdown",
+            "## Output Format",
+            "```",
+            "",
+            "Use `inline code` sparingly.",
+            ""
+        ])
+
+    def workspace(self, root, scale=1):
+        """Write a full synthetic workspace under root and return its paths."""
+        root = Path(root)
+        for sub in ("drafts", "research", "images"):
+            (root / "outputs" / sub).mkdir(parents=True, exist_ok=True)
+        (root / "agents").mkdir(parents=True, exist_ok=True)
+
+        manuscript = root / "input" / f"SLOBLACKSWAN-synthetic-{scale}x.md"
+        manuscript.parent.mkdir(parents=True, exist_ok=True)
+        manuscript.write_text(self.manuscript(scale), encoding="utf-8")
+
+        for n in range(4 * scale):
+            (root / "agents" / f"agent-{n}.mdc").write_text(self.agent_file(n), encoding="utf-8")
+
+        for ch in range(1, self.chapters * scale + 1):
+            for sec in range(1, 4):
+                for v in range(1, self.rng.randint(2, 4)):
+                    draft = root / "outputs" / "drafts" / f"draft_{ch}_section{sec}_v{v}.md"
+                    draft.write_text(self.draft(ch, sec), encoding="utf-8")
+
+        for n in range(5 * scale):
+            note = root / "outputs" / "research" / f"research_topic{n}_20251120.md"
+            note.write_text(f"# Research {n}\n\n" + "\n\n".join(self.paragraph() for _ in range(10)), encoding="utf-8")
+
+        for n in range(3 * scale):
+            ext = self.rng.choice([".png", ".jpg", ".svg"])
+            (root / "outputs" / "images" / f"figure_{n}{ext}").write_bytes(self.rng.randbytes(self.rng.randint(2_000, 50_000)))
+
+        return {"root": root, "manuscript": manuscript}
+
+
+def measure(func, repeat):
+    """Best wall time over repeat runs, then one traced run for peak memory."""
+    best = None
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def benchmarks(paths):
+    """(name, callable, bytes processed, items processed) for one workspace."""
+    root = paths["root"]
+    manuscript = paths["manuscript"]
+    manuscript_bytes = manuscript.stat().st_size
+    blocks = extract_code_blocks_with_headers(manuscript)
+    mdc_files = sorted((root / "agents").glob("*.mdc"))
+    drafts = sorted((root / "outputs" / "drafts").glob("*.md"))
+    outputs_bytes = sum(p.stat().st_size for p in (root / "outputs").rglob("*") if p.is_file())
+
+    def headers():
+        # Each call writes a new .vN.md; remove it so runs stay comparable
+        output_path = process_markdown_file(manuscript, 3)
+        output_path.unlink()
+
+    def staging():
+        organizer = OutputOrganizer(root)
+        organizer.organize_by_chapter()
+        organizer.organize_research()
+        organizer.organize_images()
+
+    def startup(*command):
+        # Fresh interpreter each time: what a hook pays per invocation
+        slobs = Path(__file__).parent / "slobs.py"
+        subprocess.run([sys.executable, str(slobs), *command, "--help"], capture_output=True, check=True)
+
+    return [
+        ("extract_code_blocks_with_headers", lambda: extract_code_blocks_with_headers(manuscript),
+         manuscript_bytes, len(blocks)),
+        ("analyze_code_block", lambda: [analyze_code_block(b) for b in blocks],
+         sum(len(b["content"]) for b in blocks), len(blocks)),
+        ("check_line_lengths", lambda: check_line_lengths(manuscript), manuscript_bytes, 1),
+        ("check_line_lengths_fast", lambda: check_line_lengths(manuscript, fast=True), manuscript_bytes, 1),
+        ("validate_file", lambda: [validate_file(p) for p in mdc_files],
+         sum(p.stat().st_size for p in mdc_files), len(mdc_files)),
+        ("process_markdown_file", headers, manuscript_bytes, 1),
+        ("OutputOrganizer", staging, outputs_bytes, len(drafts)),
+        ("slobs_startup", startup, 0, 1),
+        ("slobs_stage_startup", lambda: startup("stage"), 0, 1),
+        ("slobs_cost_startup", lambda: startup("cost"), 0, 1),
+    ]
+
+
+def run(scales, repeat, generator_options, only=None):
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix="slobs-bench-") as tmp:
+            paths = ManuscriptGenerator(**generator_options).workspace(tmp, scale)
+            print(f"\nScale {scale}x: manuscript {paths['manuscript'].stat().st_size / 1024:.0f} KB")
+            for name, func, nbytes, items in benchmarks(paths):
+                if only and name not in only:
+                    continue
+                seconds, peak = measure(func, repeat)
+                result = {
+                    "benchmark": name,
+                    "scale": scale,
+                    "seconds": round(seconds, 6),
+                    "bytes": nbytes,
+                    "items": items,
+                    "mb_per_s": round(nbytes / seconds / 1_000_000, 3) if seconds else None,
+                    "items_per_s": round(items / seconds, 1) if seconds else None,
+                    "peak_kb": round(peak / 1024, 1)
+                }
+                results.append(result)
+                print(f"  {name:<34} {seconds * 1000:9.2f} ms  {result['mb_per_s']:8.2f} MB/s  "
+                      f"{result['peak_kb']:10.1f} KB peak")
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print time ratios against a baseline; returns True if any benchmark regressed."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["benchmark"], r["scale"]): r for r in json.load(f)["results"]}
+
+    print("\n" + "=" * 80)
+    print(f"COMPARISON WITH {baseline_path}")
+    print("=" * 80)
+    regressed = False
+    for r in results:
+        old = baseline.get((r["benchmark"], r["scale"]))
+        if not old or not old["seconds"]:
+            continue
+        ratio = r["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"  {r['benchmark']:<34} {r['scale']:>4}x  {ratio:6.2f}x time  "
+              f"{r['peak_kb'] / old['peak_kb'] if old['peak_kb'] else 0:6.2f}x memory{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the manuscript scripts against synthetic books"
+    )
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated scale factors (default: 1,10,100)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; best is kept (default: 3)")
+    parser.add_argument("--only", help="Comma-separated benchmark names to run")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the generator (default: 42)")
+    parser.add_argument("--chapters", type=int, default=5, help="Chapters at scale 1 (default: 5)")
+    parser.add_argument("--heading-depth", type=int, default=4, help="Deepest heading level below chapters (default: 4)")
+    parser.add_argument("--code-density", type=float, default=0.4,
+                        help="Chance of a code block after each paragraph (default: 0.4)")
+    parser.add_argument("--output", help="Results file (default: outputs/benchmarks/benchmark_YYYYMMDD.json)")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Time ratio above which --compare reports a regression (default: 1.25)")
+    parser.add_argument("--generate-only", metavar="DIR",
+                        help="Write a synthetic workspace to DIR at the first scale and exit")
+
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",")]
+    generator_options = {
+        "seed": args.seed,
+        "chapters": args.chapters,
+        "heading_depth": args.heading_depth,
+        "code_density": args.code_density
+    }
+
+    if args.generate_only:
+        paths = ManuscriptGenerator(**generator_options).workspace(args.generate_only, scales[0])
+        print(f"Synthetic workspace written to: {paths['root']}")
+        return 0
+
+    only = set(args.only.split(",")) if args.only else None
+    results = run(scales, args.repeat, generator_options, only)
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    output = Path(args.output) if args.output else \
+        workspace / "outputs" / "benchmarks" / f"benchmark_{datetime.now().strftime('%Y%m%d')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "generator": generator_options,
+            "repeat": args.repeat,
+            "results": results
+        }, f, indent=2)
+    print(f"\nResults written to: {output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Check that Markdown links, anchors and image references resolve.
+
+Each file is parsed once (in parallel) for its heading slugs and links.
+A heading-slug index per file and an index of every file on disk are then
+built, so each link resolves with set lookups instead of rescanning
+headings or the filesystem.
+
+Usage:
+    python scripts/check_links.py
+    python scripts/check_links.py staging/ready-for-scrivener/Chapter_5
+    python scripts/check_links.py outputs/drafts input/SLOBLACKSWAN-v0.44.md --workers 4
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote
+
+from analyze_code_blocks import HEADING_PATTERN, split_sections
+from organize_outputs import OutputOrganizer
+
+# [text](target "title") and ![alt](target); target may be wrapped in <>
+LINK_PATTERN = re.compile(r'(!?)\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*<?([^)\s>]*)>?(?:\s+["\'][^)]*["\'])?\s*\)')
+REFERENCE_PATTERN = re.compile(r'^\s{0,3}\[[^\]]+\]:\s*<?(\S+?)>?(?:\s+.*)?$')
+INLINE_CODE_PATTERN = re.compile(r'`[^`]*`')
+EXTERNAL_SCHEMES = ('http://', 'https://', 'mailto:', 'ftp://', 'tel:')
+
+
+def slugify(text):
+    """GitHub-style anchor for a heading: lowercase, punctuation dropped, spaces to hyphens."""
+    # Outside inline code, drop HTML tags and _emphasis_ markers; underscores
+    # inside words (snake_case) and anything inside `code` are kept
+    parts = re.split(r'(`[^`]*`)', text.strip().lower())
+    text = ''.join(
+        part if part.startswith('`') else re.sub(r'<[^>]+>|(?<!\w)_+|_+(?!\w)', '', part)
+        for part in parts
+    )
+    text = re.sub(r'[*`~]', '', text)
+    text = re.sub(r'\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    text = re.sub(r'[^\w\- ]', '', text)
+    return text.replace(' ', '-')
+
+
+def heading_slugs(sections):
+    """All anchors of a document, numbering repeats (intro, intro-1, ...)."""
+    slugs = set()
+    counts = {}
+    for section in sections:
+        match = HEADING_PATTERN.match(section['lines'][0]) if section['level'] else None
+        if not match:
+            continue
+        slug = slugify(match.group(2))
+        n = counts.get(slug, 0)
+        counts[slug] = n + 1
+        slugs.add(slug if n == 0 else f"{slug}-{n}")
+    return slugs
+
+
+def parse_file(filepath):
+    """Return (filepath, slugs, links) where links are (line, is_image, target)."""
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        lines = f.read().split('\n')
+
+    sections = split_sections(lines)
+    links = []
+    in_code_block = False
+    for i, line in enumerate(lines, 1):
+        if line.startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
+        text = INLINE_CODE_PATTERN.sub('', line)
+        for match in LINK_PATTERN.finditer(text):
+            links.append((i, match.group(1) == '!', match.group(2)))
+        ref = REFERENCE_PATTERN.match(text)
+        if ref:
+            links.append((i, False, ref.group(1)))
+
+    return filepath, heading_slugs(sections), links
+
+
+def collect_markdown(paths):
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.rglob('*.md')))
+        elif path.exists():
+            files.append(path)
+    return [os.path.normpath(os.path.abspath(f)) for f in files]
+
+
+def index_files(folders):
+    """Absolute paths of the files directly inside each folder."""
+    index = set()
+    for folder in folders:
+        with os.scandir(folder) as entries:
+            index.update(entry.path for entry in entries if entry.is_file())
+    return index
+
+
+class LinkChecker:
+    def __init__(self, workspace, files, workers=None):
+        self.workspace = os.path.abspath(workspace)
+        self.files = files
+        self.workers = workers
+
+        # Parse every file once, in parallel
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(parse_file, files, chunksize=8))
+        self.slugs = {path: slugs for path, slugs, _ in parsed}
+        self.links = {path: links for path, _, links in parsed}
+
+        # Links mostly point at sibling files and images; anything else
+        # falls back to a filesystem check in resolve_path
+        folders = {os.path.dirname(f) for f in files}
+        for images in (os.path.join(self.workspace, 'outputs', 'images'),
+                       *(os.path.join(folder, 'Images') for folder in {os.path.dirname(d) for d in folders})):
+            if os.path.isdir(images):
+                folders.add(images)
+        self.file_index = index_files(folders)
+
+    def slugs_for(self, path):
+        # Anchors into files outside the checked set are parsed on demand
+        if path not in self.slugs:
+            self.slugs[path] = parse_file(path)[1]
+        return self.slugs[path]
+
+    def resolve_path(self, source, target):
+        """
+        Absolute path a link points to, or None if no such file.
+
+        Relative links are tried against the linking file's folder, then the
+        workspace root (agents often write outputs/images/... paths). Only
+        paths missing from the index cost a filesystem check.
+        """
+        bases = ('',) if os.path.isabs(target) else (os.path.dirname(source), self.workspace)
+        for base in bases:
+            candidate = os.path.normpath(os.path.join(base, target))
+            if candidate in self.file_index or os.path.exists(candidate):
+                return candidate
+        return None
+
+    def check_link(self, source, is_image, target):
+        """Return an error message, or None if the link resolves."""
+        if not target or target.startswith(EXTERNAL_SCHEMES):
+            return None
+
+        path_part, _, anchor = target.partition('#')
+        path_part = unquote(path_part)
+        anchor = unquote(anchor).lower()
+
+        if not path_part:
+            if anchor not in self.slugs_for(source):
+                return f"no heading for anchor #{anchor}"
+            return None
+
+        resolved = self.resolve_path(source, path_part)
+        if resolved is None:
+            kind = "image" if is_image else "file"
+            return f"{kind} not found: {path_part}"
+
+        if is_image and os.path.splitext(resolved)[1].lower() not in OutputOrganizer.IMAGE_EXTS:
+            return f"not a supported image type: {path_part}"
+
+        if anchor and resolved.endswith('.md') and anchor not in self.slugs_for(resolved):
+            return f"no heading for anchor #{anchor} in {path_part}"
+        return None
+
+    def check(self):
+        """Return [(source, line, target, message)] for every broken link."""
+        broken = []
+        for source in self.files:
+            for line, is_image, target in self.links[source]:
+                message = self.check_link(source, is_image, target)
+                if message:
+                    broken.append((source, line, target, message))
+        return broken
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check Markdown links, heading anchors and image references"
+    )
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        help='Markdown files or directories (default: staging/ready-for-scrivener)'
+    )
+    parser.add_argument('--workers', type=int, help='Parallel parser processes (default: CPU count)')
+
+    args = parser.parse_args()
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    paths = args.paths or [workspace / 'staging' / 'ready-for-scrivener']
+    files = collect_markdown(paths)
+    if not files:
+        print("No markdown files found to check")
+        return 1
+
+    checker = LinkChecker(workspace, files, args.workers)
+    broken = checker.check()
+    total = sum(len(links) for links in checker.links.values())
+
+    print(f"Checked {total} links in {len(files)} file(s)")
+    for source, line, target, message in broken:
+        print(f"  {os.path.relpath(source)}:{line}: {target} ({message})")
+
+    if broken:
+        print(f"\n✗ {len(broken)} broken link(s)")
+        return 1
+    print("\n✓ All links resolve")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Split a manuscript into chunks that fit an agent's context window.
+
+The manuscript is streamed section by section (split at headings, as in
+analyze_code_blocks) and sections are packed into chunks under a token
+budget for the target model. Chunks never split a fenced code block and,
+by default, never span two chapters, so chapters can be processed in
+parallel. Each chunk is written as its own file, plus an index.json.
+
+Usage:
+    python scripts/chunk_manuscript.py input/SLOBLACKSWAN-v0.44.md --model gpt-4o
+    python scripts/chunk_manuscript.py input/SLOBLACKSWAN-v0.44.md --budget 20000 --chapter-level 2
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+from analyze_code_blocks import iter_sections
+from cost_tracker import CostTracker
+
+# Without a model tokenizer, ~4 characters per token is a close enough
+# estimate for English prose and code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def paragraph_blocks(section):
+    """
+    Split a section into (start_line, lines) blocks at blank lines.
+
+    Fenced code blocks are kept whole even if they contain blank lines.
+    """
+    blocks = []
+    current = []
+    start = section['start_line']
+    in_code_block = False
+    for i, line in enumerate(section['lines'], section['start_line']):
+        if not current:
+            start = i
+        current.append(line)
+        if line.startswith('```'):
+            in_code_block = not in_code_block
+        elif not line.strip() and not in_code_block:
+            blocks.append((start, current))
+            current = []
+    if current:
+        blocks.append((start, current))
+    return blocks
+
+
+class Chunker:
+    def __init__(self, output_dir, budget, chapter_level=1):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Chunks from an earlier, longer run would otherwise linger
+        for stale in self.output_dir.glob('chunk_*.md'):
+            stale.unlink()
+        self.budget = budget
+        self.chapter_level = chapter_level
+        self.index = []
+        self._reset()
+
+    def _reset(self):
+        self.lines = []
+        self.tokens = 0
+        self.start_line = None
+        self.end_line = None
+        self.headings = []
+
+    def _add(self, start_line, lines, heading):
+        text = '\n'.join(lines) + '\n'
+        if self.start_line is None:
+            self.start_line = start_line
+        self.end_line = start_line + len(lines) - 1
+        self.lines.extend(lines)
+        self.tokens += estimate_tokens(text)
+        if heading and (not self.headings or self.headings[-1] != heading):
+            self.headings.append(heading)
+
+    def flush(self):
+        if not self.lines:
+            return
+        number = len(self.index) + 1
+        path = self.output_dir / f"chunk_{number:03d}.md"
+        context = self.headings[0] if self.headings else 'No heading'
+        with open(path, 'w', encoding='utf-8') as f:
+            # Tell the agent where in the book this chunk starts
+            f.write(f"<!-- chunk {number}: lines {self.start_line}-{self.end_line}, context: {context} -->\n")
+            f.write('\n'.join(self.lines) + '\n')
+        self.index.append({
+            'file': path.name,
+            'start_line': self.start_line,
+            'end_line': self.end_line,
+            'tokens': self.tokens,
+            'oversized': self.tokens > self.budget,
+            'headings': self.headings
+        })
+        self._reset()
+
+    def add_section(self, section):
+        text_tokens = estimate_tokens('\n'.join(section['lines']) + '\n')
+
+        # Chapters start a new chunk so each can be processed independently
+        if 0 < section['level'] <= self.chapter_level:
+            self.flush()
+
+        if self.tokens + text_tokens <= self.budget:
+            self._add(section['start_line'], section['lines'], section['heading_path'])
+            return
+
+        self.flush()
+        if text_tokens <= self.budget:
+            self._add(section['start_line'], section['lines'], section['heading_path'])
+            return
+
+        # Section alone is over budget: pack its paragraphs; a single code
+        # block larger than the budget becomes its own oversized chunk
+        for start, lines in paragraph_blocks(section):
+            block_tokens = estimate_tokens('\n'.join(lines) + '\n')
+            if self.tokens and self.tokens + block_tokens > self.budget:
+                self.flush()
+            self._add(start, lines, section['heading_path'])
+
+    def write_index(self, source, model):
+        with open(self.output_dir / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'source': str(source),
+                'model': model,
+                'budget': self.budget,
+                'chunks': self.index
+            }, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Split a manuscript at headings into chunks under a model's token budget"
+    )
+    parser.add_argument('filepath', help='Manuscript markdown file')
+    parser.add_argument(
+        '--model',
+        default='claude-sonnet-4',
+        choices=sorted(CostTracker.CONTEXT_WINDOWS),
+        help='Target model (default: claude-sonnet-4)'
+    )
+    parser.add_argument(
+        '--fraction',
+        type=float,
+        default=0.5,
+        help='Share of the context window a chunk may use, leaving room for instructions and output (default: 0.5)'
+    )
+    parser.add_argument('--budget', type=int, help='Token budget per chunk (overrides --model/--fraction)')
+    parser.add_argument(
+        '--chapter-level',
+        type=int,
+        default=1,
+        help='Headings at this level or above always start a new chunk; 0 disables (default: 1)'
+    )
+    parser.add_argument('--output', help='Output folder (default: outputs/chunks/<manuscript name>)')
+
+    args = parser.parse_args()
+
+    source = Path(args.filepath)
+    if not source.exists():
+        print(f"Error: File not found: {source}", file=sys.stderr)
+        return 1
+
+    budget = args.budget or int(CostTracker.CONTEXT_WINDOWS[args.model] * args.fraction)
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    output_dir = Path(args.output) if args.output else workspace / 'outputs' / 'chunks' / source.stem
+
+    chunker = Chunker(output_dir, budget, args.chapter_level)
+    with open(source, 'r', encoding='utf-8') as f:
+        for section in iter_sections(line.rstrip('\n') for line in f):
+            chunker.add_section(section)
+    chunker.flush()
+    chunker.write_index(source, args.model)
+
+    oversized = [c for c in chunker.index if c['oversized']]
+    print(f"Wrote {len(chunker.index)} chunk(s) of up to {budget:,} tokens to {output_dir}")
+    for chunk in oversized:
+        print(f"  Warning: {chunk['file']} is {chunk['tokens']:,} tokens (a single paragraph or code block is larger than the budget)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,6 @@ Usage:
     python scripts/convert_to_rtf.py --input staging/ready-for-scrivener/Chapter_5
 """
 
-import pypandoc
 from pathlib import Path
 import argparse
 
@@ -23,6 +22,8 @@ class MarkdownToRTFConverter:
         rtf_path = self.output_path / rtf_filename
         
         try:
+            # Imported here so --help and the other scripts work without pandoc
+            import pypandoc
             pypandoc.convert_file(
                 str(md_file),
                 "rtf",
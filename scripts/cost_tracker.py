@@ -3,6 +3,10 @@
 
 import os
 from datetime import datetime
+from pathlib import Path
+import argparse
+import hashlib
+import itertools
 import json
 
 class CostTracker:
@@ -16,6 +20,38 @@ class CostTracker:
         "perplexity": {"request": 0.005}  # per request
     }
     
+    # Context window per model, in tokens
+    CONTEXT_WINDOWS = {
+        "claude-sonnet-4": 200_000,
+        "claude-haiku": 200_000,
+        "gpt-4o": 128_000,
+        "gpt-4o-mini": 128_000,
+        "gemini-2.5-pro": 1_000_000,
+        "perplexity": 128_000
+    }
+    
+    def __init__(self, checkpoint_path=None):
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.ledger = self._load_checkpoint()
+        self.ledger_reset = False
+    
+    def cost_for(self, model, usage):
+        """
+        Cost in dollars of a single usage entry for one model.
+        
+        As in sweep(), only the units the model's price defines are charged
+        (tokens for most models, requests for perplexity); other units in
+        usage are ignored and missing ones count as 0.
+        """
+        prices = self.COSTS.get(model)
+        if not prices:
+            return 0
+        return sum(
+            usage.get(usage_key, 0) / per * prices[price_key]
+            for usage_key, price_key, per in self.UNITS
+            if price_key in prices
+        )
+    
     def estimate_monthly(self, usage_pattern):
         """
         Estimate monthly costs based on usage pattern.
@@ -33,16 +69,7 @@ class CostTracker:
             if model not in self.COSTS:
                 continue
             
-            if "input_tokens" in usage:
-                cost = (
-                    (usage["input_tokens"] / 1_000_000) * self.COSTS[model]["input"] +
-                    (usage["output_tokens"] / 1_000_000) * self.COSTS[model]["output"]
-                )
-            elif "requests" in usage:
-                cost = usage["requests"] * self.COSTS[model]["request"]
-            else:
-                cost = 0
-            
+            cost = self.cost_for(model, usage)
             breakdown[model] = round(cost, 2)
             total += cost
         
@@ -50,9 +77,336 @@ class CostTracker:
             "total": round(total, 2),
             "breakdown": breakdown
         }
+    
+    # Billing units in the order used by the sweep matrices; token prices
+    # are per 1M tokens, request prices per request.
+    UNITS = (("input_tokens", "input", 1_000_000), ("output_tokens", "output", 1_000_000), ("requests", "request", 1))
+    
+    def sweep(self, scenarios, price_tables=None):
+        """
+        Cost every usage scenario against every price table in one batch.
+        
+        scenarios is a list of usage_pattern dicts (as for estimate_monthly),
+        price_tables a list of COSTS-style dicts (default: [self.COSTS]).
+        A model is only charged for the units its price table defines.
+        
+        Returns {"costs": S x P matrix, "models": [...]} where costs[s][p]
+        is the total for scenario s under price table p. The matrix is a
+        numpy array when numpy is installed, otherwise a list of lists.
+        """
+        # Imported here so commands that never sweep start without numpy
+        try:
+            import numpy as np
+        except ImportError:  # Scenario sweeps fall back to plain Python
+            np = None
+        
+        price_tables = price_tables or [self.COSTS]
+        models = sorted(set(self.COSTS).union(*price_tables))
+        column = {model: i * len(self.UNITS) for i, model in enumerate(models)}
+        width = len(models) * len(self.UNITS)
+        
+        # Flatten to usage (S x width) and price (P x width) rows so the
+        # whole sweep is a single matrix product.
+        usage_rows = []
+        for usage_pattern in scenarios:
+            row = [0.0] * width
+            for model, usage in usage_pattern.items():
+                if model not in column:
+                    continue
+                for j, (usage_key, _, per) in enumerate(self.UNITS):
+                    row[column[model] + j] = usage.get(usage_key, 0) / per
+            usage_rows.append(row)
+        
+        price_rows = []
+        for table in price_tables:
+            row = [0.0] * width
+            for model, prices in table.items():
+                for j, (_, price_key, _) in enumerate(self.UNITS):
+                    row[column[model] + j] = prices.get(price_key, 0)
+            price_rows.append(row)
+        
+        if np is not None:
+            costs = np.asarray(usage_rows, dtype=float).reshape(len(usage_rows), width) @ \
+                np.asarray(price_rows, dtype=float).reshape(len(price_rows), width).T
+        else:
+            # Price rows are mostly zeros; only multiply the priced columns
+            priced = [[(j, p) for j, p in enumerate(row) if p] for row in price_rows]
+            costs = [
+                [sum(usage[j] * p for j, p in prices) for prices in priced]
+                for usage in usage_rows
+            ]
+        
+        return {"costs": costs, "models": models}
+    
+    def assignment_scenarios(self, agent_usage, candidates):
+        """
+        Build one usage scenario per assignment of models to agents.
+        
+        agent_usage = {
+            "research": {"input_tokens": 1000000, "output_tokens": 200000},
+            "writing": {"input_tokens": 5000000, "output_tokens": 2000000},
+            ...
+        }
+        candidates maps each agent to the models it may use (default: every
+        model in COSTS that prices all of the agent's usage units, so token
+        workloads are not "assigned" to per-request models). Returns (assignments, scenarios) in matching order,
+        ready to pass the scenarios to sweep().
+        """
+        candidates = candidates or {}
+        agents = sorted(agent_usage)
+        options = [candidates.get(agent) or self._models_pricing(agent_usage[agent]) for agent in agents]
+        
+        assignments = []
+        scenarios = []
+        for models in itertools.product(*options):
+            usage_pattern = {}
+            for agent, model in zip(agents, models):
+                totals = usage_pattern.setdefault(model, {})
+                for usage_key, amount in agent_usage[agent].items():
+                    totals[usage_key] = totals.get(usage_key, 0) + amount
+            assignments.append(dict(zip(agents, models)))
+            scenarios.append(usage_pattern)
+        
+        return assignments, scenarios
+    
+    def _models_pricing(self, usage):
+        price_keys = {price_key for usage_key, price_key, _ in self.UNITS if usage.get(usage_key)}
+        return [model for model, prices in self.COSTS.items() if price_keys <= set(prices)]
+    
+    def cheapest_assignments(self, agent_usage, candidates=None, top=5):
+        """Rank agent-to-model assignments by total cost under COSTS."""
+        assignments, scenarios = self.assignment_scenarios(agent_usage, candidates)
+        if not scenarios:
+            return []
+        costs = self.sweep(scenarios)["costs"]
+        totals = [float(row[0]) for row in costs]
+        order = sorted(range(len(totals)), key=totals.__getitem__)[:top]
+        return [(assignments[i], round(totals[i], 2)) for i in order]
+    
+    def _empty_ledger(self):
+        return {
+            "log": None,
+            "offset": 0,
+            "head": None,
+            "tail": None,
+            "records": 0,
+            "skipped": 0,
+            "by_day": {},
+            "by_model": {},
+            "by_chapter": {}
+        }
+    
+    def _load_checkpoint(self):
+        """Load running totals saved by a previous ingest, if any."""
+        if self.checkpoint_path and self.checkpoint_path.exists():
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return self._empty_ledger()
+    
+    def save_checkpoint(self):
+        """Persist running totals and the log offset they cover."""
+        if not self.checkpoint_path:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.ledger, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def _add_to_bucket(self, bucket, key, record, cost):
+        totals = bucket.setdefault(key, {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "requests": 0,
+            "cost": 0.0
+        })
+        totals["input_tokens"] += record.get("input_tokens", 0)
+        totals["output_tokens"] += record.get("output_tokens", 0)
+        totals["requests"] += record.get("requests", 1)
+        totals["cost"] += cost
+    
+    def add_record(self, record):
+        """
+        Fold one usage record into the running totals.
+        
+        record = {
+            "model": "claude-sonnet-4",
+            "input_tokens": 12000, "output_tokens": 3000,
+            "requests": 1,
+            "timestamp": "2025-11-20T14:03:00",
+            "chapter": "5"
+        }
+        """
+        model = record["model"]
+        usage = {
+            "input_tokens": record.get("input_tokens", 0),
+            "output_tokens": record.get("output_tokens", 0),
+            "requests": record.get("requests", 1)
+        }
+        cost = self.cost_for(model, usage)
+        
+        try:
+            day = datetime.fromisoformat(record["timestamp"]).strftime("%Y-%m-%d")
+        except (KeyError, TypeError, ValueError):
+            day = "unknown"
+        chapter = str(record.get("chapter") or "unassigned")
+        
+        by_day = self.ledger["by_day"].setdefault(day, {})
+        self._add_to_bucket(by_day, model, record, cost)
+        self._add_to_bucket(self.ledger["by_model"], model, record, cost)
+        self._add_to_bucket(self.ledger["by_chapter"], chapter, record, cost)
+        self.ledger["records"] += 1
+    
+    def _fingerprint_bytes(self, data):
+        return {"length": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+    
+    def _line_fingerprint(self, f, start, length):
+        f.seek(start)
+        return self._fingerprint_bytes(f.read(length))
+    
+    def _checkpoint_matches(self, log_path, f):
+        """
+        True if the checkpoint covers a prefix of this very log.
+        
+        The resolved path, the first line and the last ingested line must
+        all match, so a log read under another name, rotated, or replaced
+        by a different file is detected even when it is larger.
+        """
+        ledger = self.ledger
+        if ledger["log"] != str(log_path) or not ledger.get("head") or not ledger.get("tail"):
+            return False
+        if log_path.stat().st_size < ledger["offset"]:
+            return False
+        head, tail = ledger["head"], ledger["tail"]
+        return (
+            self._line_fingerprint(f, 0, head["length"]) == head and
+            self._line_fingerprint(f, ledger["offset"] - tail["length"], tail["length"]) == tail
+        )
+    
+    def ingest_log(self, log_path):
+        """
+        Read new records from an append-only JSONL usage log.
+        
+        Only bytes past the checkpointed offset are read. A trailing line
+        without a newline is treated as still being written and left for
+        the next run. If the checkpoint does not cover this log (another
+        file, or the log was rotated or replaced), the totals are reset and
+        the log is read from the start, so no record is counted twice.
+        
+        Returns the number of records ingested.
+        """
+        log_path = Path(log_path).resolve()
+        self.ledger_reset = False
+        
+        ingested = 0
+        with open(log_path, "rb") as f:
+            if self.ledger["offset"] and not self._checkpoint_matches(log_path, f):
+                self.ledger = self._empty_ledger()
+                self.ledger_reset = True
+            offset = self.ledger["offset"]
+            
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                if offset == 0:
+                    self.ledger["head"] = self._fingerprint_bytes(raw)
+                self.ledger["tail"] = self._fingerprint_bytes(raw)
+                offset += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    self.add_record(record)
+                    ingested += 1
+                except (ValueError, KeyError, TypeError):
+                    self.ledger["skipped"] += 1
+        
+        self.ledger["log"] = str(log_path)
+        self.ledger["offset"] = offset
+        self.save_checkpoint()
+        return ingested
+    
+    def usage_report(self):
+        """Rounded running totals grouped by day, model and chapter."""
+        def rounded(bucket):
+            return {
+                key: dict(totals, cost=round(totals["cost"], 2))
+                for key, totals in sorted(bucket.items())
+            }
+        
+        return {
+            "total": round(sum(t["cost"] for t in self.ledger["by_model"].values()), 2),
+            "records": self.ledger["records"],
+            "skipped": self.ledger["skipped"],
+            "by_day": {day: rounded(models) for day, models in sorted(self.ledger["by_day"].items())},
+            "by_model": rounded(self.ledger["by_model"]),
+            "by_chapter": rounded(self.ledger["by_chapter"])
+        }
 
-# Example usage
-if __name__ == "__main__":
+def print_usage_report(report):
+    print("=== Actual Usage ===")
+    print(f"Total: ${report['total']} ({report['records']} records, {report['skipped']} skipped)")
+    print("\nBy model:")
+    for model, totals in report["by_model"].items():
+        print(f"  {model}: ${totals['cost']} ({totals['input_tokens']:,} in / {totals['output_tokens']:,} out, {totals['requests']} requests)")
+    print("\nBy chapter:")
+    for chapter, totals in report["by_chapter"].items():
+        print(f"  {chapter}: ${totals['cost']}")
+    print("\nBy day:")
+    for day, models in report["by_day"].items():
+        print(f"  {day}: ${round(sum(t['cost'] for t in models.values()), 2)}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate API costs or report actual usage from a usage log"
+    )
+    parser.add_argument(
+        "--log",
+        help="Append-only JSONL usage log to ingest"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Running totals file, so only new log records are read (default: outputs/usage/ledger.json)"
+    )
+    
+    parser.add_argument(
+        "--sweep",
+        help="JSON file of per-agent usage ({\"agents\": {...}, \"candidates\": {...}}) to rank model assignments"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of assignments to show with --sweep (default: 5)"
+    )
+    
+    args = parser.parse_args()
+    
+    if args.sweep:
+        with open(args.sweep, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        tracker = CostTracker()
+        ranked = tracker.cheapest_assignments(spec["agents"], spec.get("candidates"), args.top)
+        print("=== Cheapest Model Assignments ===")
+        for rank, (assignment, total) in enumerate(ranked, 1):
+            models = ", ".join(f"{agent}={model}" for agent, model in assignment.items())
+            print(f"  {rank}. ${total}: {models}")
+        return
+    
+    if args.log:
+        # Get workspace root (parent of scripts/)
+        workspace = Path(__file__).parent.parent
+        checkpoint = args.checkpoint or workspace / "outputs" / "usage" / "ledger.json"
+        tracker = CostTracker(checkpoint)
+        ingested = tracker.ingest_log(args.log)
+        if tracker.ledger_reset:
+            print("Checkpoint did not match this log; totals were recounted from the start")
+        print(f"Ingested {ingested} new records from {args.log}\n")
+        print_usage_report(tracker.usage_report())
+        return
+    
     tracker = CostTracker()
     
     # Moderate book writing usage
@@ -81,3 +435,6 @@ if __name__ == "__main__":
     print("\nBreakdown:")
     for model, cost in estimate['breakdown'].items():
         print(f"  {model}: ${cost}")
+
+if __name__ == "__main__":
+    main()
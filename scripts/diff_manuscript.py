@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Diff two manuscript versions section by section.
+
+Sections are aligned by heading path (e.g. "Chapter 5 > Burn Rates >
+Fast Burn") and compared by content hash, so the diff runs in linear time
+and reports which sections changed, were added or were removed. Checks,
+conversions and agent critiques can then target only those sections.
+
+Usage:
+    python scripts/diff_manuscript.py input/SLOBLACKSWAN-v0.44.md input/SLOBLACKSWAN-v0.45.md
+    python scripts/diff_manuscript.py old.md new.md --json > changes.json
+    python scripts/diff_manuscript.py old.md new.md --extract changed_sections.md
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from analyze_code_blocks import split_sections
+
+
+def hash_sections(filepath):
+    """
+    Split a manuscript into sections keyed by (heading path, occurrence).
+
+    The occurrence number tells apart repeated headings under the same
+    parent, such as several "Example" subsections.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+
+    keyed = {}
+    seen = {}
+    for section in split_sections(lines):
+        path = section['heading_path']
+        occurrence = seen.get(path, 0)
+        seen[path] = occurrence + 1
+        body = '\n'.join(section['lines'])
+        keyed[(path, occurrence)] = {
+            'heading_path': path,
+            'occurrence': occurrence,
+            'start_line': section['start_line'],
+            'end_line': section['end_line'],
+            'hash': hashlib.sha256(body.encode('utf-8')).hexdigest(),
+            'content': body
+        }
+    return keyed
+
+
+def diff_sections(old_path, new_path):
+    """Compare two manuscripts; returns changed/added/removed section lists in document order."""
+    old = hash_sections(old_path)
+    new = hash_sections(new_path)
+
+    changed = []
+    added = []
+    unchanged = 0
+    for key, section in new.items():
+        if key not in old:
+            added.append(section)
+        elif old[key]['hash'] != section['hash']:
+            changed.append(dict(section, old_start_line=old[key]['start_line'], old_end_line=old[key]['end_line']))
+        else:
+            unchanged += 1
+    removed = [section for key, section in old.items() if key not in new]
+
+    return {
+        'old': str(old_path),
+        'new': str(new_path),
+        'changed': changed,
+        'added': added,
+        'removed': removed,
+        'unchanged': unchanged
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report changed, added and removed sections between two manuscript versions"
+    )
+    parser.add_argument('old', help='Previous manuscript version')
+    parser.add_argument('new', help='New manuscript version')
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the diff as JSON (without section contents)'
+    )
+    parser.add_argument(
+        '--extract',
+        help='Write the changed and added sections of the new version to this markdown file'
+    )
+
+    args = parser.parse_args()
+
+    for path in (args.old, args.new):
+        if not Path(path).exists():
+            print(f"Error: File not found: {path}", file=sys.stderr)
+            return 1
+
+    diff = diff_sections(args.old, args.new)
+
+    if args.extract:
+        with open(args.extract, 'w', encoding='utf-8') as f:
+            for section in sorted(diff['changed'] + diff['added'], key=lambda s: s['start_line']):
+                f.write(section['content'].rstrip('\n') + '\n\n')
+        print(f"Changed sections written to: {args.extract}", file=sys.stderr)
+
+    if args.json:
+        def strip(sections):
+            return [{k: v for k, v in s.items() if k != 'content'} for s in sections]
+        print(json.dumps(dict(diff, changed=strip(diff['changed']), added=strip(diff['added']),
+                              removed=strip(diff['removed'])), indent=2))
+        return 0
+
+    print(f"Comparing {diff['old']} → {diff['new']}")
+    print(f"Unchanged: {diff['unchanged']}  Changed: {len(diff['changed'])}  "
+          f"Added: {len(diff['added'])}  Removed: {len(diff['removed'])}")
+
+    for label, sections in (('CHANGED', diff['changed']), ('ADDED', diff['added']), ('REMOVED', diff['removed'])):
+        if not sections:
+            continue
+        print(f"\n{label}:")
+        for section in sections:
+            print(f"  lines {section['start_line']}-{section['end_line']}: {section['heading_path']}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
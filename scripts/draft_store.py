@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Deduplicated, compressed archive of draft versions.
+
+Drafts (draft_CHAPTER_SECTION_vN.md) and post-processed copies
+(name.vN.md) are split into content-defined chunks at line boundaries.
+Each distinct chunk is stored once, zlib-compressed, so successive
+revisions of a draft only add the chunks that actually changed.
+
+Usage:
+    python scripts/draft_store.py add outputs/drafts
+    python scripts/draft_store.py add outputs/drafts --remove-originals
+    python scripts/draft_store.py list
+    python scripts/draft_store.py get draft_5_intro --version 3
+    python scripts/draft_store.py stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+from pathlib import Path
+
+# draft_5_intro_v3.md -> (draft_5_intro, 3); intro.v3.md -> (intro, 3)
+VERSION_PATTERN = re.compile(r'^(?P<name>.+?)(?:_v|\.v)(?P<version>\d+)\.md$')
+
+MIN_CHUNK = 1024
+MAX_CHUNK = 64 * 1024
+# A line ends a chunk when its CRC has these low bits clear (~1 in 16 lines)
+BOUNDARY_MASK = 0xF
+
+
+def split_version(filename):
+    """Return (document name, version) for a versioned draft filename."""
+    match = VERSION_PATTERN.match(filename)
+    if match:
+        return match.group('name'), int(match.group('version'))
+    return Path(filename).stem, 1
+
+
+def chunk_content(data):
+    """
+    Split bytes into content-defined chunks.
+
+    Boundaries depend only on line content, so an edit in one paragraph
+    leaves the chunks of the rest of the file unchanged.
+    """
+    chunks = []
+    current = []
+    size = 0
+    for line in data.splitlines(keepends=True):
+        current.append(line)
+        size += len(line)
+        if size >= MAX_CHUNK or (size >= MIN_CHUNK and zlib.crc32(line) & BOUNDARY_MASK == 0):
+            chunks.append(b''.join(current))
+            current = []
+            size = 0
+    if current:
+        chunks.append(b''.join(current))
+    return chunks
+
+
+class DraftStore:
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        self.chunks_dir = self.store_dir / "chunks"
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.store_dir / "manifest.json"
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {"documents": {}, "chunks": {}}
+
+    def save(self):
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _chunk_path(self, digest):
+        return self.chunks_dir / digest[:2] / digest
+
+    def add(self, filepath):
+        """
+        Archive one draft file.
+
+        Returns True if a new version was stored, False if this exact
+        version was already archived. Raises ValueError if the version is
+        already archived with different content (for example
+        draft_5_intro_v2.md and draft_5_intro.v2.md), so neither copy is
+        overwritten in the store.
+        """
+        filepath = Path(filepath)
+        name, version = split_version(filepath.name)
+        data = filepath.read_bytes()
+        file_hash = hashlib.sha256(data).hexdigest()
+
+        existing = self.manifest["documents"].get(name, {}).get(str(version))
+        if existing:
+            if existing["sha256"] == file_hash:
+                return False
+            raise ValueError(
+                f"{filepath.name}: {name} v{version} is already archived from "
+                f"{existing['file']} with different content"
+            )
+        versions = self.manifest["documents"].setdefault(name, {})
+
+        digests = []
+        for chunk in chunk_content(data):
+            digest = hashlib.sha256(chunk).hexdigest()
+            if digest not in self.manifest["chunks"]:
+                compressed = zlib.compress(chunk, 9)
+                path = self._chunk_path(digest)
+                path.parent.mkdir(exist_ok=True)
+                path.write_bytes(compressed)
+                self.manifest["chunks"][digest] = {"size": len(chunk), "stored": len(compressed)}
+            digests.append(digest)
+
+        versions[str(version)] = {
+            "file": filepath.name,
+            "sha256": file_hash,
+            "size": len(data),
+            "mtime": filepath.stat().st_mtime,
+            "chunks": digests
+        }
+        return True
+
+    def is_archived(self, filepath):
+        """True if the store holds exactly this file's current content."""
+        filepath = Path(filepath)
+        name, version = split_version(filepath.name)
+        entry = self.manifest["documents"].get(name, {}).get(str(version))
+        if not entry:
+            return False
+        return entry["sha256"] == hashlib.sha256(filepath.read_bytes()).hexdigest()
+
+    def materialize(self, name, version=None):
+        """Rebuild the bytes of a stored version (default: latest)."""
+        versions = self.manifest["documents"].get(name)
+        if not versions:
+            raise KeyError(f"No archived document named {name}")
+        version = str(version) if version is not None else max(versions, key=int)
+        if version not in versions:
+            raise KeyError(f"{name} has no version {version} (have {', '.join(sorted(versions, key=int))})")
+
+        entry = versions[version]
+        data = b''.join(zlib.decompress(self._chunk_path(d).read_bytes()) for d in entry["chunks"])
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"Archived {name} v{version} is corrupt (hash mismatch)")
+        return data
+
+    def stats(self):
+        """Original vs stored bytes across all archived versions."""
+        original = sum(
+            entry["size"]
+            for versions in self.manifest["documents"].values()
+            for entry in versions.values()
+        )
+        unique = sum(c["size"] for c in self.manifest["chunks"].values())
+        stored = sum(c["stored"] for c in self.manifest["chunks"].values())
+        return {
+            "documents": len(self.manifest["documents"]),
+            "versions": sum(len(v) for v in self.manifest["documents"].values()),
+            "chunks": len(self.manifest["chunks"]),
+            "original_bytes": original,
+            "unique_bytes": unique,
+            "stored_bytes": stored,
+            "saved_bytes": original - stored,
+            "ratio": original / stored if stored else 0
+        }
+
+
+def collect_drafts(paths):
+    """Expand files and directories into versioned markdown drafts."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.glob("*.md") if VERSION_PATTERN.match(p.name)))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Archive draft versions as deduplicated, compressed chunks"
+    )
+    parser.add_argument(
+        "--store",
+        help="Store directory (default: outputs/.draft_store)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = subparsers.add_parser("add", help="Archive draft files or directories")
+    add_parser.add_argument("paths", nargs="+", help="Draft files or directories of drafts")
+    add_parser.add_argument(
+        "--remove-originals",
+        action="store_true",
+        help="Delete archived files except the latest version of each draft"
+    )
+
+    subparsers.add_parser("list", help="List archived drafts and versions")
+
+    get_parser = subparsers.add_parser("get", help="Materialize an archived version")
+    get_parser.add_argument("name", help="Draft name without version (e.g. draft_5_intro)")
+    get_parser.add_argument("--version", type=int, help="Version number (default: latest)")
+    get_parser.add_argument("--output", help="Write to this file instead of stdout")
+
+    subparsers.add_parser("stats", help="Report space saved")
+
+    args = parser.parse_args()
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    store = DraftStore(args.store or workspace / "outputs" / ".draft_store")
+
+    if args.command == "add":
+        files = collect_drafts(args.paths)
+        added = []
+        conflicts = []
+        for f in files:
+            try:
+                if store.add(f):
+                    added.append(f)
+            except ValueError as e:
+                conflicts.append(f)
+                print(f"Error: {e.args[0]}; rename it to a new version", file=sys.stderr)
+        store.save()
+        print(f"Archived {len(added)} new version(s) from {len(files)} file(s)")
+
+        if args.remove_originals:
+            latest = {}
+            for f in files:
+                name, version = split_version(f.name)
+                if version > latest.get(name, (0, None))[0]:
+                    latest[name] = (version, f)
+            keep = {f for _, f in latest.values()}
+            for f in files:
+                # Only delete a file whose own content is what the store holds
+                if f not in keep and store.is_archived(f):
+                    f.unlink()
+                    print(f"  Removed: {f.name}")
+
+        if conflicts:
+            return 1
+
+    elif args.command == "list":
+        for name, versions in sorted(store.manifest["documents"].items()):
+            numbers = ", ".join(f"v{v}" for v in sorted(versions, key=int))
+            print(f"{name}: {numbers}")
+
+    elif args.command == "get":
+        try:
+            data = store.materialize(args.name, args.version)
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e.args[0]}", file=sys.stderr)
+            return 1
+        if args.output:
+            Path(args.output).write_bytes(data)
+            print(f"Written: {args.output}")
+        else:
+            sys.stdout.buffer.write(data)
+
+    elif args.command == "stats":
+        s = store.stats()
+        print("=== Draft Store ===")
+        print(f"Documents: {s['documents']}  Versions: {s['versions']}  Chunks: {s['chunks']}")
+        print(f"Original size: {s['original_bytes'] / 1024:.1f} KB")
+        print(f"After dedup:   {s['unique_bytes'] / 1024:.1f} KB")
+        print(f"Stored:        {s['stored_bytes'] / 1024:.1f} KB")
+        print(f"Saved:         {s['saved_bytes'] / 1024:.1f} KB ({s['ratio']:.1f}x)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+File hashing shared by the scripts.
+
+Kept free of other imports so scripts that only need a content hash
+(image staging, the search index, the agent cache) do not load each
+other's dependencies.
+"""
+
+import hashlib
+
+
+def hash_file(path):
+    """SHA-256 of a file's contents, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Persistent index of manuscript structure.
+
+Sections (heading, heading path, line span), code blocks (language, line
+span, hash) and the issues analyze_code_block finds in them are stored in
+a SQLite database in outputs/.manuscript_index.db. An update re-extracts
+and re-analyzes only sections whose content changed; sections that merely
+moved have their line numbers shifted. Questions about the manuscript then
+become indexed lookups instead of a full reparse.
+
+Usage:
+    python scripts/manuscript_index.py update input/SLOBLACKSWAN-v0.44.md
+    python scripts/manuscript_index.py blocks --language python --min-lines 100
+    python scripts/manuscript_index.py blocks --contains get_threshold
+    python scripts/manuscript_index.py issues --severity high
+    python scripts/manuscript_index.py sections --heading "Burn Rate"
+    python scripts/manuscript_index.py report
+    python scripts/manuscript_index.py sql "SELECT language, COUNT(*) FROM code_blocks GROUP BY language"
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+from pathlib import Path
+
+from analyze_code_blocks import (
+    DEFAULT_MANUSCRIPT, HEADING_PATTERN, analyze_code_block, iter_sections, print_report
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    path TEXT,
+    seq INTEGER,
+    heading_path TEXT,
+    heading TEXT,
+    level INTEGER,
+    start_line INTEGER,
+    end_line INTEGER,
+    hash TEXT
+);
+CREATE TABLE IF NOT EXISTS code_blocks (
+    id INTEGER PRIMARY KEY,
+    section_id INTEGER,
+    path TEXT,
+    start_line INTEGER,
+    end_line INTEGER,
+    language TEXT,
+    line_count INTEGER,
+    hash TEXT,
+    heading_path TEXT,
+    section_heading TEXT,
+    content TEXT
+);
+CREATE TABLE IF NOT EXISTS issues (
+    block_id INTEGER,
+    type TEXT,
+    severity TEXT,
+    message TEXT,
+    location TEXT
+);
+CREATE INDEX IF NOT EXISTS sections_path ON sections (path, seq);
+CREATE INDEX IF NOT EXISTS code_blocks_section ON code_blocks (section_id);
+CREATE INDEX IF NOT EXISTS code_blocks_language ON code_blocks (language, line_count);
+CREATE INDEX IF NOT EXISTS issues_block ON issues (block_id);
+"""
+
+BLOCK_COLUMNS = "path, start_line, end_line, language, line_count, hash, heading_path, section_heading, content"
+
+
+def section_heading(section):
+    """Text of the section's own heading ('No heading' before the first one)."""
+    if not section['level']:
+        return 'No heading'
+    return HEADING_PATTERN.match(section['lines'][0]).group(2).strip()
+
+
+def section_code_blocks(section):
+    """
+    Code blocks of one section, in the dict format of
+    extract_code_blocks_with_headers. An unclosed block is dropped, as there.
+    """
+    heading = section_heading(section)
+    blocks = []
+    start = None
+    content = []
+    for i, line in enumerate(section['lines'], section['start_line']):
+        if not line.startswith('```'):
+            if start is not None:
+                content.append(line)
+        elif start is None:
+            start = i
+            language = line[3:].strip() or 'plain'
+            content = []
+        else:
+            blocks.append({
+                'start_line': start,
+                'end_line': i,
+                'language': language,
+                'content': '\n'.join(content),
+                'line_count': len(content),
+                'heading_path': section['heading_path'],
+                'section_heading': heading
+            })
+            start = None
+    return blocks
+
+
+def section_hash(section):
+    # The heading path is hashed too, so a moved section keeps its context
+    body = section['heading_path'] + '\0' + '\n'.join(section['lines'])
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class ManuscriptIndex:
+    def __init__(self, db_path):
+        self.db = sqlite3.connect(str(db_path))
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _delete_sections(self, ids):
+        for section_id in ids:
+            self.db.execute(
+                "DELETE FROM issues WHERE block_id IN (SELECT id FROM code_blocks WHERE section_id = ?)",
+                (section_id,)
+            )
+            self.db.execute("DELETE FROM code_blocks WHERE section_id = ?", (section_id,))
+            self.db.execute("DELETE FROM sections WHERE id = ?", (section_id,))
+
+    def _insert_section(self, path, seq, section, sha):
+        heading = section_heading(section)
+        cursor = self.db.execute(
+            "INSERT INTO sections (path, seq, heading_path, heading, level, start_line, end_line, hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, seq, section['heading_path'], heading, section['level'],
+             section['start_line'], section['end_line'], sha)
+        )
+        section_id = cursor.lastrowid
+        for block in section_code_blocks(section):
+            block_id = self.db.execute(
+                f"INSERT INTO code_blocks (section_id, {BLOCK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (section_id, path, block['start_line'], block['end_line'], block['language'], block['line_count'],
+                 hashlib.sha256(block['content'].encode('utf-8')).hexdigest(),
+                 block['heading_path'], block['section_heading'], block['content'])
+            ).lastrowid
+            self.db.executemany(
+                "INSERT INTO issues (block_id, type, severity, message, location) VALUES (?, ?, ?, ?, ?)",
+                [(block_id, i['type'], i['severity'], i['message'], i['location']) for i in analyze_code_block(block)]
+            )
+
+    def _move_section(self, section_id, seq, section):
+        """Renumber an unchanged section that moved within the document."""
+        old_start = self.db.execute("SELECT start_line FROM sections WHERE id = ?", (section_id,)).fetchone()[0]
+        delta = section['start_line'] - old_start
+        self.db.execute(
+            "UPDATE sections SET seq = ?, start_line = ?, end_line = ? WHERE id = ?",
+            (seq, section['start_line'], section['end_line'], section_id)
+        )
+        if not delta:
+            return
+        self.db.execute(
+            "UPDATE code_blocks SET start_line = start_line + ?, end_line = end_line + ? WHERE section_id = ?",
+            (delta, delta, section_id)
+        )
+        # The only issue whose location uses document line numbers
+        self.db.execute(
+            """
+            UPDATE issues SET location = (
+                SELECT 'lines ' || start_line || '-' || end_line FROM code_blocks WHERE id = issues.block_id
+            )
+            WHERE type = 'long_code_block'
+              AND block_id IN (SELECT id FROM code_blocks WHERE section_id = ?)
+            """,
+            (section_id,)
+        )
+
+    def update(self, filepath):
+        """
+        Bring the index for one manuscript up to date.
+
+        Unchanged files are skipped by size and mtime. Otherwise sections are
+        matched to indexed ones by content hash; only new or edited sections
+        are extracted and analyzed. Returns (changed, moved, removed) counts,
+        or None if the file was unchanged.
+        """
+        filepath = Path(filepath)
+        path = str(filepath.resolve())
+        stat = filepath.stat()
+        row = self.db.execute("SELECT mtime_ns, size FROM documents WHERE path = ?", (path,)).fetchone()
+        if row == (stat.st_mtime_ns, stat.st_size):
+            return None
+
+        known = {}
+        for section_id, sha in self.db.execute("SELECT id, hash FROM sections WHERE path = ? ORDER BY seq", (path,)):
+            known.setdefault(sha, []).append(section_id)
+
+        changed = moved = 0
+        with self.db:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                for seq, section in enumerate(iter_sections(line.rstrip('\n') for line in f)):
+                    sha = section_hash(section)
+                    if known.get(sha):
+                        self._move_section(known[sha].pop(0), seq, section)
+                        moved += 1
+                    else:
+                        self._insert_section(path, seq, section, sha)
+                        changed += 1
+
+            stale = [section_id for ids in known.values() for section_id in ids]
+            self._delete_sections(stale)
+            self.db.execute(
+                "INSERT OR REPLACE INTO documents (path, mtime_ns, size) VALUES (?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size)
+            )
+        return changed, moved, len(stale)
+
+    def blocks(self, path=None, language=None, min_lines=None, contains=None, heading=None):
+        """Code blocks matching all given filters, in document order."""
+        where, params = [], []
+        for clause, value in (("path = ?", path), ("language = ?", language), ("line_count >= ?", min_lines),
+                              ("instr(content, ?) > 0", contains), ("heading_path LIKE ?", heading and f"%{heading}%")):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = f"SELECT id, {BLOCK_COLUMNS} FROM code_blocks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self.db.execute(sql + " ORDER BY path, start_line", params)
+        names = ['id'] + [c.strip() for c in BLOCK_COLUMNS.split(',')]
+        return [dict(zip(names, row)) for row in rows]
+
+    def issues(self, path=None, issue_type=None, severity=None):
+        """(block, issue) pairs matching the filters, in document order."""
+        where, params = [], []
+        for clause, value in (("b.path = ?", path), ("i.type = ?", issue_type), ("i.severity = ?", severity)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = f"""
+            SELECT b.id, i.type, i.severity, i.message, i.location
+            FROM issues i JOIN code_blocks b ON b.id = i.block_id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY b.path, b.start_line
+        """
+        rows = self.db.execute(sql, params).fetchall()
+        blocks = {b['id']: b for b in self.blocks(path)}
+        return [
+            (blocks[block_id], {'type': t, 'severity': s, 'message': m, 'location': loc})
+            for block_id, t, s, m, loc in rows
+        ]
+
+    def sections(self, path=None, heading=None):
+        where, params = [], []
+        if path is not None:
+            where.append("path = ?")
+            params.append(path)
+        if heading is not None:
+            where.append("heading_path LIKE ?")
+            params.append(f"%{heading}%")
+        sql = """
+            SELECT s.path, s.heading_path, s.level, s.start_line, s.end_line,
+                   (SELECT COUNT(*) FROM code_blocks b WHERE b.section_id = s.id)
+            FROM sections s
+        """
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.db.execute(sql + " ORDER BY s.path, s.seq", params).fetchall()
+
+    def stats(self):
+        return {
+            table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('documents', 'sections', 'code_blocks', 'issues')
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index manuscript headings, code blocks and issues in SQLite and query them"
+    )
+    parser.add_argument('--db', help='Index database (default: outputs/.manuscript_index.db)')
+    parser.add_argument(
+        '--file',
+        default=DEFAULT_MANUSCRIPT,
+        help='Manuscript to update before querying and to restrict results to (default: SLOBLACKSWAN-v0.44.md)'
+    )
+    parser.add_argument('--no-update', action='store_true', help='Query the index as is')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update_parser = subparsers.add_parser('update', help='Index new and changed sections')
+    update_parser.add_argument('filepath', nargs='?', help='Manuscript markdown file (default: --file)')
+
+    blocks_parser = subparsers.add_parser('blocks', help='List code blocks')
+    blocks_parser.add_argument('--language', help='Only blocks in this language')
+    blocks_parser.add_argument('--min-lines', type=int, help='Only blocks with at least this many lines')
+    blocks_parser.add_argument('--contains', help='Only blocks whose code contains this text')
+    blocks_parser.add_argument('--heading', help='Only blocks whose heading path contains this text')
+
+    issues_parser = subparsers.add_parser('issues', help='List issues found by analyze_code_block')
+    issues_parser.add_argument('--type', help='Issue type, e.g. undefined_method')
+    issues_parser.add_argument('--severity', choices=['high', 'medium', 'low'])
+
+    sections_parser = subparsers.add_parser('sections', help='List sections')
+    sections_parser.add_argument('--heading', help='Only sections whose heading path contains this text')
+
+    subparsers.add_parser('report', help='Print the analyze_code_blocks report from the index')
+
+    sql_parser = subparsers.add_parser('sql', help='Run a read-only SQL query against the index')
+    sql_parser.add_argument('query')
+
+    subparsers.add_parser('stats', help='Show index size')
+
+    args = parser.parse_args()
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    db_path = Path(args.db) if args.db else workspace / 'outputs' / '.manuscript_index.db'
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    source = Path(getattr(args, 'filepath', None) or args.file)
+
+    index = ManuscriptIndex(db_path)
+    try:
+        if source.exists() and not args.no_update:
+            result = index.update(source)
+            if result:
+                changed, moved, removed = result
+                print(f"Indexed {source.name}: {changed} section(s) analyzed, {moved} reused, {removed} removed",
+                      file=sys.stderr)
+            elif args.command == 'update':
+                print(f"{source.name} is up to date", file=sys.stderr)
+        elif args.command == 'update':
+            print(f"Error: File not found: {source}", file=sys.stderr)
+            return 1
+        path = str(source.resolve()) if source.exists() else None
+
+        if args.command == 'blocks':
+            blocks = index.blocks(path, args.language, args.min_lines, args.contains, args.heading)
+            for block in blocks:
+                print(f"lines {block['start_line']}-{block['end_line']}  {block['language']}, "
+                      f"{block['line_count']} lines  [{block['heading_path']}]")
+            print(f"\n{len(blocks)} code block(s)")
+
+        elif args.command == 'issues':
+            issues = index.issues(path, args.type, args.severity)
+            for block, issue in issues:
+                print(f"lines {block['start_line']}-{block['end_line']}  [{issue['severity']}] {issue['type']}: "
+                      f"{issue['message']}  [{block['heading_path']}]")
+            print(f"\n{len(issues)} issue(s)")
+
+        elif args.command == 'sections':
+            for _, heading, level, start, end, block_count in index.sections(path, args.heading):
+                print(f"lines {start}-{end}  {'#' * level or '-'} {heading}  ({block_count} code block(s))")
+
+        elif args.command == 'report':
+            blocks = index.blocks(path)
+            all_issues = index.issues(path)
+            by_block = {}
+            for block, issue in all_issues:
+                by_block.setdefault(block['id'], (block, []))[1].append(issue)
+            print_report(blocks, list(by_block.values()), all_issues)
+
+        elif args.command == 'sql':
+            readonly = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                cursor = readonly.execute(args.query)
+                if cursor.description:
+                    print('\t'.join(d[0] for d in cursor.description))
+                for row in cursor:
+                    print('\t'.join(str(v) for v in row))
+            except sqlite3.Error as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            finally:
+                readonly.close()
+
+        elif args.command == 'stats':
+            s = index.stats()
+            print(f"Documents: {s['documents']}  Sections: {s['sections']}  Code blocks: {s['code_blocks']}  "
+                  f"Issues: {s['issues']}  Database: {db_path.stat().st_size / 1024:.1f} KB")
+    finally:
+        index.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
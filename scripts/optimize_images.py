@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Deduplicate and optimize images for staging.
+
+Images are hashed so copies saved under different names by different agent
+runs are stored once; the other names are staged as hard links to it, so
+links to any of them still resolve. Optionally, PNG/JPEG images are recompressed and
+downscaled (with Pillow) and SVGs are minified, in a process pool. Results
+are cached by source hash in outputs/cache/images/, so each image is only
+optimized once.
+
+Usage:
+    python scripts/optimize_images.py outputs/images --output /tmp/images
+    python scripts/optimize_images.py outputs/images --output /tmp/images --optimize --max-width 1600
+
+Staging uses this through organize_outputs.py --images [--optimize].
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+from hashing import hash_file
+
+RASTER_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG"}
+
+# Whitespace inside these elements can be rendered, so it is left alone
+SVG_PRESERVE_PATTERN = re.compile(r'(<(text|style|script)\b.*?</\2>)', re.DOTALL | re.IGNORECASE)
+SVG_COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.DOTALL)
+SVG_METADATA_PATTERN = re.compile(r'<metadata\b.*?</metadata>', re.DOTALL | re.IGNORECASE)
+# Cache entries are <source sha256>_<options tag>.<ext>
+CACHE_ENTRY_PATTERN = re.compile(r'^[0-9a-f]{64}_[0-9a-f]{8}\.[a-z]+$')
+
+
+def load_pillow():
+    """
+    PIL.Image, or None if Pillow is not installed.
+
+    Imported on first use so staging without --optimize starts quickly;
+    raster images are copied as-is without Pillow.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def minify_svg(text):
+    """Drop comments, metadata and whitespace between tags."""
+    if 'xml:space="preserve"' in text:
+        return text
+    parts = SVG_PRESERVE_PATTERN.split(text)
+    out = []
+    # split() yields [outside, whole match, tag name, outside, ...]
+    for i in range(0, len(parts), 3):
+        outside = SVG_METADATA_PATTERN.sub('', SVG_COMMENT_PATTERN.sub('', parts[i]))
+        outside = re.sub(r'>\s+<', '><', outside)
+        out.append(re.sub(r'\s+', ' ', outside))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out).strip() + '\n'
+
+
+def optimize_raster(src, dest, max_width=None, quality=85):
+    """Recompress (and downscale past max_width) a PNG or JPEG into dest."""
+    Image = load_pillow()
+    fmt = RASTER_FORMATS[src.suffix.lower()]
+    with Image.open(src) as image:
+        if max_width and image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+        if fmt == "JPEG":
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(dest, fmt, quality=quality, optimize=True, progressive=True)
+        else:
+            image.save(dest, fmt, optimize=True)
+
+
+def optimize_image(job):
+    """
+    Worker: write the optimized form of src to dest.
+
+    Falls back to the original bytes when optimization does not make the
+    file smaller or the type is not handled. Returns (dest, optimized).
+    """
+    src, dest, options = Path(job[0]), Path(job[1]), job[2]
+    tmp_path = dest.with_name(dest.name + '.tmp')
+    ext = src.suffix.lower()
+    optimized = False
+    try:
+        if ext == '.svg':
+            tmp_path.write_text(minify_svg(src.read_text(encoding='utf-8')), encoding='utf-8')
+            optimized = True
+        elif ext in RASTER_FORMATS and load_pillow() is not None:
+            optimize_raster(src, tmp_path, options['max_width'], options['quality'])
+            optimized = True
+    except (OSError, ValueError, UnicodeDecodeError):
+        optimized = False
+
+    if not optimized or tmp_path.stat().st_size >= src.stat().st_size:
+        shutil.copyfile(src, tmp_path)
+        optimized = False
+    os.replace(tmp_path, dest)
+    return str(dest), optimized
+
+
+def stage_images(files, dest_dir, cache_dir=None, optimize=False, max_width=None, quality=85, workers=None):
+    """
+    Copy images into dest_dir once per distinct content.
+
+    The first file (by name) with a given hash is staged; later ones are
+    reported as duplicates of it and staged as hard links to it (copies
+    where the filesystem has no hard links). With optimize, uncached images are
+    optimized in a process pool and the cache is pruned to the current
+    images.
+
+    Returns {"staged": [names], "duplicates": {name: kept name},
+             "bytes_in": n, "bytes_out": n}.
+    """
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    unique = {}
+    duplicates = {}
+    bytes_in = 0
+    for path in sorted(map(Path, files), key=lambda p: p.name):
+        bytes_in += path.stat().st_size
+        sha = hash_file(path)
+        if sha in unique:
+            duplicates[path.name] = unique[sha].name
+        else:
+            unique[sha] = path
+
+    sources = {}
+    if optimize:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        options = {'max_width': max_width, 'quality': quality, 'pillow': load_pillow() is not None}
+        # Changing options gives every image a new cache entry
+        tag = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+        jobs = []
+        for sha, path in unique.items():
+            cached = cache_dir / f"{sha}_{tag}{path.suffix.lower()}"
+            sources[path] = cached
+            if not cached.exists():
+                jobs.append((str(path), str(cached), options))
+        if jobs:
+            # Imported here: multiprocessing is slow to load and only needed for new images
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(optimize_image, jobs))
+
+        # Only remove files this function wrote, so a shared cache directory is safe
+        keep = {p.name for p in sources.values()}
+        for entry in cache_dir.iterdir():
+            if entry.name not in keep and entry.is_file() and CACHE_ENTRY_PATTERN.match(entry.name):
+                entry.unlink()
+    else:
+        sources = {path: path for path in unique.values()}
+
+    bytes_out = 0
+    for path, source in sources.items():
+        target = dest_dir / path.name
+        # A name linked to another image by an earlier run must not be written through
+        if target.exists():
+            target.unlink()
+        shutil.copy2(source, target)
+        bytes_out += source.stat().st_size
+
+    for name, kept in duplicates.items():
+        target = dest_dir / name
+        if target.exists():
+            target.unlink()
+        try:
+            os.link(dest_dir / kept, target)
+        except OSError:
+            shutil.copy2(dest_dir / kept, target)
+
+    return {
+        'staged': sorted(path.name for path in sources),
+        'duplicates': duplicates,
+        'bytes_in': bytes_in,
+        'bytes_out': bytes_out
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deduplicate images and optionally recompress, downscale and minify them"
+    )
+    parser.add_argument('source', help='Folder of images')
+    parser.add_argument('--output', required=True, help='Folder to write the distinct images to')
+    parser.add_argument('--optimize', action='store_true', help='Recompress PNG/JPEG (needs Pillow) and minify SVG')
+    parser.add_argument('--max-width', type=int, help='Downscale raster images wider than this many pixels')
+    parser.add_argument('--quality', type=int, default=85, help='JPEG quality when recompressing (default: 85)')
+    parser.add_argument('--workers', type=int, help='Parallel optimizer processes (default: CPU count)')
+    parser.add_argument('--cache', help='Optimized image cache (default: outputs/cache/images)')
+
+    args = parser.parse_args()
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    exts = set(RASTER_FORMATS) | {'.gif', '.svg'}
+    files = [p for p in Path(args.source).iterdir() if p.suffix.lower() in exts]
+    if args.optimize and load_pillow() is None:
+        print("Note: Pillow is not installed; PNG/JPEG images are copied without recompression")
+
+    result = stage_images(
+        files, args.output, args.cache or workspace / 'outputs' / 'cache' / 'images',
+        args.optimize, args.max_width, args.quality, args.workers
+    )
+    for name, kept in sorted(result['duplicates'].items()):
+        print(f"  Duplicate: {name} (same as {kept})")
+    print(f"Wrote {len(result['staged'])} image(s), linked {len(result['duplicates'])} duplicate(s): "
+          f"{result['bytes_in'] / 1024:.1f} KB → {result['bytes_out'] / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Run research, writing, critique and technical agent jobs concurrently.
+
+Agents are read from agents/*.mdc (model, tools, instructions). Jobs from a
+JSON file are dispatched in parallel to OpenAI-compatible chat completion
+endpoints, with a token-bucket rate limit and a concurrency cap per
+provider, retries with exponential backoff, and outputs written straight
+into outputs/ with the names organize_outputs.py expects. Every call is
+appended to outputs/usage/usage.jsonl for cost_tracker.py.
+
+Usage:
+    python scripts/orchestrate_agents.py jobs.json
+    python scripts/orchestrate_agents.py jobs.json --dry-run
+
+    # Local fake provider for testing, then point every provider at it
+    python scripts/orchestrate_agents.py --fake-server 8765
+    python scripts/orchestrate_agents.py jobs.json --provider-url http://127.0.0.1:8765/v1
+
+Job file:
+    {"jobs": [
+        {"id": "notes", "agent": "research", "topic": "black_swan_incidents", "prompt": "..."},
+        {"id": "draft", "agent": "writing", "chapter": "5", "section": "intro",
+         "prompt": "...", "after": ["notes"]},
+        {"agent": "critique", "chapter": "5", "section": "intro", "after": ["draft"]}
+    ]}
+
+A job's inputs are its "inputs" files plus the outputs of the jobs listed
+in "after", which it waits for.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from agent_cache import DEFAULT_PERSONA_FILES, AgentCache
+from chunk_manuscript import estimate_tokens
+from validate_mdc import extract_frontmatter
+
+DEFAULT_PROVIDERS = {
+    "anthropic": {
+        "base_url": "https://api.anthropic.com/v1",
+        "api_key_env": "ANTHROPIC_API_KEY",
+        "requests_per_minute": 50,
+        "tokens_per_minute": 40_000,
+        "max_concurrency": 4
+    },
+    "openai": {
+        "base_url": "https://api.openai.com/v1",
+        "api_key_env": "OPENAI_API_KEY",
+        "requests_per_minute": 60,
+        "tokens_per_minute": 60_000,
+        "max_concurrency": 4
+    },
+    "google": {
+        "base_url": "https://generativelanguage.googleapis.com/v1beta/openai",
+        "api_key_env": "GEMINI_API_KEY",
+        "requests_per_minute": 60,
+        "tokens_per_minute": 250_000,
+        "max_concurrency": 4
+    },
+    "perplexity": {
+        "base_url": "https://api.perplexity.ai",
+        "api_key_env": "PERPLEXITY_API_KEY",
+        "requests_per_minute": 20,
+        "tokens_per_minute": 100_000,
+        "max_concurrency": 2,
+        # The research agent names the provider; the API wants a model
+        "models": {"perplexity": "sonar-pro"}
+    }
+}
+
+# Model name prefix -> provider
+MODEL_PROVIDERS = [
+    ("claude", "anthropic"),
+    ("gpt", "openai"),
+    ("o1", "openai"),
+    ("o3", "openai"),
+    ("gemini", "google"),
+    ("sonar", "perplexity"),
+    ("perplexity", "perplexity")
+]
+
+# Providers whose chat completions search the web themselves; other
+# models only see the prompt and input files
+WEB_SEARCH_PROVIDERS = {"perplexity"}
+
+
+class ProviderError(Exception):
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def parse_simple_yaml(block):
+    """
+    Parse the nested key: value subset of YAML used in .mdc frontmatter.
+
+    Like validate_mdc, this avoids a YAML dependency; values stay strings
+    except true/false.
+    """
+    root = {}
+    stack = [(-1, root)]
+    for line in block.split('\n'):
+        if not line.strip() or line.strip().startswith('#') or ':' not in line:
+            continue
+        indent = len(line) - len(line.lstrip())
+        key, _, value = line.strip().partition(':')
+        value = value.strip()
+        while stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1]
+        if not value:
+            parent[key] = {}
+            stack.append((indent, parent[key]))
+        elif value in ('true', 'false'):
+            parent[key] = value == 'true'
+        else:
+            parent[key] = value.strip('"\'')
+    return root
+
+
+def load_agents(agents_dir):
+    """Map short agent names (research, writing, ...) to their definitions."""
+    agents = {}
+    for path in sorted(Path(agents_dir).glob('*.mdc')):
+        _, metadata, instructions = extract_frontmatter(path.read_text(encoding='utf-8'))
+        definition = parse_simple_yaml(metadata)
+        definition['path'] = path
+        definition['instructions'] = instructions
+        agents[path.stem.replace('-agent', '')] = definition
+    return agents
+
+
+def enabled_tools(tools, prefix=''):
+    """Flatten an agent's tools: block into enabled names ('all', 'search.web', ...)."""
+    if not isinstance(tools, dict):
+        return []
+    names = []
+    for key, value in tools.items():
+        if isinstance(value, dict):
+            names.extend(enabled_tools(value, f"{prefix}{key}."))
+        elif value is True:
+            names.append(prefix + key)
+    return names
+
+
+def provider_for(model):
+    for prefix, provider in MODEL_PROVIDERS:
+        if model.lower().startswith(prefix):
+            return provider
+    raise ValueError(f"No provider known for model {model}")
+
+
+class TokenBucket:
+    """Async token bucket: `rate` units per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, amount=1):
+        # A request larger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class Provider:
+    """OpenAI-compatible chat completions endpoint with rate limiting and retries."""
+
+    def __init__(self, name, config, base_url=None, retries=4):
+        self.name = name
+        self.base_url = (base_url or config['base_url']).rstrip('/')
+        self.api_key = os.environ.get(config.get('api_key_env', ''), '')
+        self.models = config.get('models', {})
+        self.requests = TokenBucket(config['requests_per_minute'] / 60, max(1, config['requests_per_minute'] // 10))
+        self.tokens = TokenBucket(config['tokens_per_minute'] / 60, config['tokens_per_minute'])
+        self.slots = asyncio.Semaphore(config['max_concurrency'])
+        self.retries = retries
+
+    def _post(self, payload):
+        request = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Authorization': f"Bearer {self.api_key}"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=600) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            retryable = e.code == 429 or e.code >= 500
+            raise ProviderError(f"{self.name} HTTP {e.code}: {e.read()[:200]!r}", retryable) from e
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise ProviderError(f"{self.name} unreachable: {e}", retryable=True) from e
+
+    async def complete(self, model, system, prompt):
+        """Return (text, usage) for one chat completion."""
+        payload = {
+            'model': self.models.get(model, model),
+            'messages': [{'role': 'system', 'content': system}, {'role': 'user', 'content': prompt}]
+        }
+        estimate = estimate_tokens(system) + estimate_tokens(prompt)
+
+        for attempt in range(self.retries + 1):
+            async with self.slots:
+                await self.requests.acquire()
+                await self.tokens.acquire(estimate)
+                try:
+                    # urllib blocks, so each call runs in a worker thread
+                    result = await asyncio.get_running_loop().run_in_executor(None, self._post, payload)
+                    break
+                except ProviderError as e:
+                    if not e.retryable or attempt == self.retries:
+                        raise
+            # Exponential backoff with jitter, outside the concurrency slot
+            await asyncio.sleep(min(60, 2 ** attempt) * (0.5 + random.random()))
+
+        usage = result.get('usage', {})
+        return result['choices'][0]['message']['content'], {
+            'input_tokens': usage.get('prompt_tokens', estimate),
+            'output_tokens': usage.get('completion_tokens', 0)
+        }
+
+
+class Orchestrator:
+    def __init__(self, workspace, agents, providers, max_concurrency=8, cache=None, dry_run=False):
+        self.workspace = Path(workspace)
+        self.outputs = self.workspace / 'outputs'
+        self.agents = agents
+        self.providers = providers
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.cache = cache
+        self.dry_run = dry_run
+        self.usage_log = self.outputs / 'usage' / 'usage.jsonl'
+        self.persona = [self.workspace / p for p in DEFAULT_PERSONA_FILES if (self.workspace / p).exists()]
+        # Output paths handed out in this run, so jobs that would get the same name do not collide
+        self.claimed = set()
+
+    def _claim(self, path):
+        candidate = path
+        n = 2
+        while candidate in self.claimed or candidate.exists():
+            candidate = path.with_name(f"{path.stem}_{n}{path.suffix}")
+            n += 1
+        self.claimed.add(candidate)
+        return candidate
+
+    def output_path(self, agent_name, job):
+        """
+        Name outputs the way the agents and OutputOrganizer expect.
+
+        Timestamps are to the minute, so when a name is already taken (by a
+        file or by another job in this run) a counter is added: _2, _3, ...
+        Drafts get the next free version number instead.
+        """
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%MZ')
+        chapter = job.get('chapter', 'x')
+        section = job.get('section', 'x')
+        if agent_name == 'research':
+            path = self.outputs / 'research' / f"research_{job.get('topic', section)}_{stamp}.md"
+        elif agent_name == 'writing':
+            drafts = self.outputs / 'drafts'
+            pattern = re.compile(rf'^draft_{re.escape(chapter)}_{re.escape(section)}_v(\d+)\.md$')
+            names = {p.name for p in drafts.glob('draft_*.md')} | {p.name for p in self.claimed}
+            versions = [int(m.group(1)) for name in names if (m := pattern.match(name))]
+            path = drafts / f"draft_{chapter}_{section}_v{max(versions, default=0) + 1}.md"
+        elif agent_name == 'critique':
+            path = self.outputs / 'critiques' / f"critique_{chapter}_{section}_{stamp}.md"
+        elif agent_name == 'technical':
+            path = self.outputs / 'critiques' / f"validation_{chapter}_{section}_{stamp}.md"
+        else:
+            path = self.outputs / agent_name / f"{agent_name}_{chapter}_{section}_{stamp}.md"
+        return self._claim(path)
+
+    def build_prompt(self, agent, job, inputs):
+        system = agent['instructions']
+        for path in self.persona:
+            system += f"\n\n<!-- {path.name} -->\n" + path.read_text(encoding='utf-8')
+        prompt = job.get('prompt', '')
+        for path in inputs:
+            prompt += f"\n\n<!-- {Path(path).name} -->\n" + Path(path).read_text(encoding='utf-8')
+        return system, prompt
+
+    def log_usage(self, model, usage, chapter):
+        # CostTracker prices each model by its own units (tokens or requests)
+        self.usage_log.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.usage_log, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dict(
+                usage, model=model, requests=1, chapter=chapter,
+                timestamp=datetime.now(timezone.utc).isoformat(timespec='seconds')
+            )) + '\n')
+
+    async def run_job(self, job, dependencies):
+        # Wait for upstream jobs; their outputs become this job's inputs
+        upstream = [await task for task in dependencies]
+        agent_name = job['agent']
+        agent = self.agents[agent_name]
+        model = job.get('model', agent['model'])
+        inputs = [self.workspace / p for p in job.get('inputs', [])] + [p for p in upstream if p]
+
+        if self.dry_run:
+            tools = ', '.join(enabled_tools(agent.get('tools'))) or 'none'
+            print(f"  would run {agent_name} ({model}, tools: {tools}) on {len(inputs)} input(s) → "
+                  f"{self.output_path(agent_name, job).relative_to(self.workspace)}")
+            return None
+
+        system, prompt = self.build_prompt(agent, job, inputs)
+        key = None
+        output = None
+        if self.cache:
+            # The prompt is part of the key: jobs without input files differ only by it
+            key = self.cache.fingerprint(agent['path'], self.persona, inputs, model, messages=[system, prompt])
+            output = self.cache.get(key)
+
+        if output is None:
+            async with self.slots:
+                output, usage = await self.providers[provider_for(model)].complete(model, system, prompt)
+            self.log_usage(model, usage, job.get('chapter'))
+            if self.cache:
+                self.cache.put(key, output, model=model, usage=usage)
+
+        # No await between naming and writing, so concurrent drafts get distinct versions
+        path = self.output_path(agent_name, job)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(output, encoding='utf-8')
+        print(f"  {agent_name}: {path.relative_to(self.workspace)}")
+        return path
+
+    def _check_tools(self, job, warned):
+        """Say once per agent and model when the agent's web search tool cannot be honoured."""
+        agent = self.agents[job['agent']]
+        model = job.get('model', agent['model'])
+        if (job['agent'], model) in warned or 'search.web' not in enabled_tools(agent.get('tools')):
+            return
+        warned.add((job['agent'], model))
+        try:
+            searches = provider_for(model) in WEB_SEARCH_PROVIDERS
+        except ValueError:  # Reported when the job runs
+            return
+        if not searches:
+            print(f"  Note: {agent['path'].name} enables web search, but {model} cannot search "
+                  f"through the chat API; it only sees the prompt and inputs")
+
+    async def run(self, jobs):
+        """Run all jobs; returns {job id: output path or exception}."""
+        tasks = {}
+        warned = set()
+        for n, job in enumerate(jobs):
+            job.setdefault('id', f"job{n + 1}")
+            if job['agent'] not in self.agents:
+                raise ValueError(f"Job {job['id']}: unknown agent {job['agent']} (have {', '.join(self.agents)})")
+            self._check_tools(job, warned)
+            missing = [d for d in job.get('after', []) if d not in tasks]
+            if missing:
+                raise ValueError(f"Job {job['id']}: 'after' must name earlier jobs, not {', '.join(missing)}")
+            tasks[job['id']] = asyncio.create_task(
+                self.run_job(job, [tasks[d] for d in job.get('after', [])])
+            )
+
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        if self.cache:
+            self.cache.save()
+        return dict(zip(tasks, results))
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible /chat/completions that echoes the request, for tests."""
+    error_rate = 0.0
+    delay = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        time.sleep(self.delay)
+        if random.random() < self.error_rate:
+            self.send_response(429)
+            self.end_headers()
+            self.wfile.write(b'{"error": "rate limited"}')
+            return
+
+        prompt = body['messages'][-1]['content']
+        text = f"# Fake response from {body['model']}\n\nReceived {len(prompt)} characters.\n"
+        payload = json.dumps({
+            'choices': [{'message': {'role': 'assistant', 'content': text}}],
+            'usage': {
+                'prompt_tokens': sum(estimate_tokens(m['content']) for m in body['messages']),
+                'completion_tokens': estimate_tokens(text)
+            }
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run agent jobs concurrently against model providers"
+    )
+    parser.add_argument('jobs', nargs='?', help='JSON job file')
+    parser.add_argument('--providers', help='JSON file overriding provider settings (base_url, rate limits, ...)')
+    parser.add_argument('--provider-url', help='Send every provider\'s requests to this base URL (e.g. a fake server)')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='Jobs in flight across all providers (default: 8)')
+    parser.add_argument('--retries', type=int, default=4, help='Retries per call on 429/5xx/network errors (default: 4)')
+    parser.add_argument('--cache', action='store_true', help='Reuse outputs from agent_cache.py for unchanged inputs')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would run without calling providers')
+    parser.add_argument('--fake-server', type=int, metavar='PORT', help='Run a local fake provider on PORT')
+    parser.add_argument('--fake-error-rate', type=float, default=0.0, help='Share of fake requests answered with 429')
+    parser.add_argument('--fake-delay', type=float, default=0.0, help='Seconds the fake server waits per request')
+
+    args = parser.parse_args()
+
+    if args.fake_server:
+        FakeProviderHandler.error_rate = args.fake_error_rate
+        FakeProviderHandler.delay = args.fake_delay
+        server = ThreadingHTTPServer(('127.0.0.1', args.fake_server), FakeProviderHandler)
+        print(f"Fake provider listening on http://127.0.0.1:{args.fake_server}/v1")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if not args.jobs:
+        parser.error("a job file is required unless --fake-server is given")
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    with open(args.jobs, 'r', encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+
+    provider_config = {name: dict(config) for name, config in DEFAULT_PROVIDERS.items()}
+    if args.providers:
+        with open(args.providers, 'r', encoding='utf-8') as f:
+            for name, overrides in json.load(f).items():
+                provider_config.setdefault(name, {}).update(overrides)
+
+    async def run():
+        providers = {
+            name: Provider(name, config, args.provider_url, args.retries)
+            for name, config in provider_config.items()
+        }
+        cache = AgentCache(workspace / 'outputs' / 'cache') if args.cache else None
+        orchestrator = Orchestrator(workspace, load_agents(workspace / 'agents'), providers,
+                                    args.max_concurrency, cache, args.dry_run)
+        return await orchestrator.run(jobs)
+
+    print(f"Running {len(jobs)} job(s)...")
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run())
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    failed = {job_id: r for job_id, r in results.items() if isinstance(r, BaseException)}
+    for job_id, error in failed.items():
+        print(f"  ✗ {job_id}: {error}")
+    print(f"\n{'✗' if failed else '✓'} {len(results) - len(failed)}/{len(results)} job(s) "
+          f"finished in {time.perf_counter() - started:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
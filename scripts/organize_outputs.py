@@ -13,12 +13,17 @@ from pathlib import Path
 from datetime import datetime
 import argparse
 
+from optimize_images import stage_images
+
 class OutputOrganizer:
+    IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".svg"}
+    
     def __init__(self, workspace_root):
         self.root = Path(workspace_root)
         self.outputs = self.root / "outputs"
         self.staging = self.root / "staging" / "ready-for-scrivener"
         self.staging.mkdir(parents=True, exist_ok=True)
+        self.image_duplicates = {}
         
     def organize_by_chapter(self, chapter=None):
         """Organize outputs by chapter."""
@@ -64,21 +69,32 @@ class OutputOrganizer:
             shutil.copy2(file, dest)
             print(f"  Staged: {file.name} → Research_Notes/")
     
-    def organize_images(self):
-        """Copy images to staging."""
+    def organize_images(self, optimize=False, max_width=None, quality=85):
+        """Stage each distinct image once, optionally optimized."""
         images_staging = self.staging / "Images"
         images_staging.mkdir(exist_ok=True)
         
-        image_exts = {".png", ".jpg", ".jpeg", ".gif", ".svg"}
         image_files = []
         
-        for ext in image_exts:
+        for ext in self.IMAGE_EXTS:
             image_files.extend((self.outputs / "images").glob(f"*{ext}"))
         
-        for file in image_files:
-            dest = images_staging / file.name
-            shutil.copy2(file, dest)
-            print(f"  Staged: {file.name} → Images/")
+        result = stage_images(
+            image_files,
+            images_staging,
+            cache_dir=self.outputs / "cache" / "images",
+            optimize=optimize,
+            max_width=max_width,
+            quality=quality
+        )
+        self.image_duplicates = result["duplicates"]
+        
+        for name in result["staged"]:
+            print(f"  Staged: {name} → Images/")
+        for name, kept in sorted(result["duplicates"].items()):
+            print(f"  Duplicate: {name} (same as {kept}, linked)")
+        if image_files:
+            print(f"  Images: {result['bytes_in'] / 1024:.1f} KB → {result['bytes_out'] / 1024:.1f} KB")
     
     def create_manifest(self):
         """Create manifest of staged files."""
@@ -97,6 +113,12 @@ class OutputOrganizer:
                         if file != "MANIFEST.md":
                             f.write(f"- {file}\n")
                     f.write("\n")
+            
+            if self.image_duplicates:
+                f.write("## Duplicate images (hard links to the same image)\n\n")
+                for name, kept in sorted(self.image_duplicates.items()):
+                    f.write(f"- {name} → Images/{kept}\n")
+                f.write("\n")
         
         print(f"\nManifest created: {manifest_path}")
 
@@ -119,6 +141,16 @@ def main():
         action="store_true",
         help="Organize images"
     )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Recompress PNG/JPEG (needs Pillow) and minify SVG images while staging"
+    )
+    parser.add_argument(
+        "--max-width",
+        type=int,
+        help="With --optimize, downscale images wider than this many pixels"
+    )
     
     args = parser.parse_args()
     
@@ -132,12 +164,12 @@ def main():
     elif args.research:
         organizer.organize_research()
     elif args.images:
-        organizer.organize_images()
+        organizer.organize_images(optimize=args.optimize, max_width=args.max_width)
     else:
         # Do everything
         organizer.organize_by_chapter()
         organizer.organize_research()
-        organizer.organize_images()
+        organizer.organize_images(optimize=args.optimize, max_width=args.max_width)
     
     # Always create manifest
     organizer.create_manifest()
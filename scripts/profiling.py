@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Lightweight per-phase profiling shared by the scripts.
+
+Scripts wrap their phases (reading, tokenizing, each check, report
+printing) in PROFILER.phase(...). When profiling is off, phase() returns
+a shared no-op context manager, so instrumented code costs one attribute
+check per phase.
+
+Usage from a script:
+    from profiling import PROFILER, add_profile_arguments, start_profiling, finish_profiling
+
+    with PROFILER.phase("read") as phase:
+        content = f.read()
+        phase.nbytes = len(content)
+
+Then run it with --profile (summary table on stderr) and optionally
+--profile-trace trace.json (open in chrome://tracing or Perfetto).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+
+class _NullPhase:
+    """Shared stand-in when profiling is off; setting nbytes is ignored."""
+    nbytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_DISABLED = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "nbytes", "start")
+
+    def __init__(self, profiler, name, nbytes):
+        self.profiler = profiler
+        self.name = name
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns(), self.nbytes)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.keep_events = False
+        self.stats = {}
+        self.events = []
+        self.origin = time.perf_counter_ns()
+
+    def enable(self, keep_events=False):
+        self.enabled = True
+        self.keep_events = keep_events
+        self.stats = {}
+        self.events = []
+        self.origin = time.perf_counter_ns()
+
+    def phase(self, name, nbytes=0):
+        """Context manager timing one occurrence of a phase or rule."""
+        if not self.enabled:
+            return _DISABLED
+        return _Phase(self, name, nbytes)
+
+    def record(self, name, start, end, nbytes=0):
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = {"calls": 0, "ns": 0, "bytes": 0}
+        stat["calls"] += 1
+        stat["ns"] += end - start
+        stat["bytes"] += nbytes
+        if self.keep_events:
+            self.events.append((name, start, end, os.getpid(), threading.get_ident(), nbytes))
+
+    def take(self):
+        """Return (stats, events) recorded so far and start over; used in worker processes."""
+        taken = (self.stats, self.events)
+        self.stats = {}
+        self.events = []
+        return taken
+
+    def merge(self, stats, events=()):
+        """Add stats and events taken from a worker process."""
+        for name, other in stats.items():
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = {"calls": 0, "ns": 0, "bytes": 0}
+            stat["calls"] += other["calls"]
+            stat["ns"] += other["ns"]
+            stat["bytes"] += other["bytes"]
+        if self.keep_events:
+            self.events.extend(events)
+
+    def summary(self, file=None):
+        """Print a table of phases sorted by total time (inclusive of nested phases)."""
+        file = file or sys.stderr
+        print("\n" + "=" * 80, file=file)
+        print("PROFILE", file=file)
+        print("=" * 80, file=file)
+        print(f"{'phase':<40} {'calls':>8} {'total ms':>10} {'avg us':>10} {'KB':>8}", file=file)
+        for name, stat in sorted(self.stats.items(), key=lambda item: item[1]["ns"], reverse=True):
+            print(f"{name:<40} {stat['calls']:>8} {stat['ns'] / 1e6:>10.2f} "
+                  f"{stat['ns'] / stat['calls'] / 1e3:>10.1f} {stat['bytes'] / 1024:>8.1f}", file=file)
+
+    def write_trace(self, path):
+        """Write recorded phases in Chrome trace event format."""
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {"bytes": nbytes} if nbytes else {}
+            }
+            for name, start, end, pid, tid, nbytes in self.events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+PROFILER = Profiler()
+
+
+def add_profile_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time, calls and bytes per phase and rule to stderr"
+    )
+    parser.add_argument(
+        "--profile-trace",
+        metavar="FILE",
+        help="Also write a Chrome trace (JSON) of every phase to FILE"
+    )
+
+
+def start_worker_profiling(keep_events):
+    """ProcessPoolExecutor initializer: profile in the worker as in the parent."""
+    PROFILER.enable(keep_events)
+
+
+def start_profiling(args):
+    if args.profile or args.profile_trace:
+        PROFILER.enable(keep_events=bool(args.profile_trace))
+
+
+def finish_profiling(args):
+    if not PROFILER.enabled:
+        return
+    PROFILER.summary()
+    if args.profile_trace:
+        PROFILER.write_trace(args.profile_trace)
+        print(f"Trace written to: {args.profile_trace}", file=sys.stderr)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Compile and run the manuscript's Python code blocks in isolated workers.
+
+Every ```python block found by extract_code_blocks_with_headers is run in
+its own `python -I` subprocess with CPU, memory and wall-clock limits, on
+a pool of workers. Results are cached by block hash, so only edited
+examples are re-run; timeouts and kills depend on machine load and are
+always retried.
+
+Usage:
+    python scripts/run_code_blocks.py input/SLOBLACKSWAN-v0.44.md
+    python scripts/run_code_blocks.py input/SLOBLACKSWAN-v0.44.md --compile-only
+    python scripts/run_code_blocks.py input/SLOBLACKSWAN-v0.44.md --workers 8 --timeout 5 --failures-only
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from analyze_code_blocks import extract_code_blocks_with_headers
+
+# Runs inside the worker: apply resource limits, then execute the block
+# read from stdin. Limits are skipped where the resource module is missing.
+RUNNER = """
+import sys
+cpu_seconds, memory_bytes = int(sys.argv[1]), int(sys.argv[2])
+try:
+    import resource
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+except (ImportError, ValueError, OSError):
+    pass
+source = sys.stdin.read()
+exec(compile(source, sys.argv[3], 'exec'), {'__name__': '__main__'})
+"""
+
+# Outcomes decided by the block alone; timeout and killed are not cached
+CACHEABLE_STATUSES = {'pass', 'fail', 'syntax_error', 'compiled'}
+
+
+def block_key(block, options):
+    """Cache key: block source plus everything that can change its outcome."""
+    parts = [block['content'], sys.version, json.dumps(options, sort_keys=True)]
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def last_line(text):
+    lines = [l for l in text.strip().split('\n') if l.strip()]
+    return lines[-1].strip() if lines else ''
+
+
+def run_block(block, options):
+    """Compile, then (unless compile_only) execute one block; returns a result dict."""
+    label = f"block@{block['start_line']}"
+    try:
+        compile(block['content'], label, 'exec')
+    except SyntaxError as e:
+        return {'status': 'syntax_error', 'detail': f"{e.msg} (line {e.lineno})"}
+
+    if options['compile_only']:
+        return {'status': 'compiled', 'detail': ''}
+
+    with tempfile.TemporaryDirectory(prefix='slobs-run-') as workdir:
+        try:
+            proc = subprocess.run(
+                [sys.executable, '-I', '-c', RUNNER,
+                 str(options['timeout']), str(options['memory_mb'] * 1024 * 1024), label],
+                input=block['content'],
+                capture_output=True,
+                text=True,
+                cwd=workdir,
+                env={'PATH': os.environ.get('PATH', ''), 'PYTHONHASHSEED': '0'},
+                # CPU limit ends busy loops; the wall limit also covers sleeps and I/O waits
+                timeout=options['timeout'] * 2 + 1
+            )
+        except subprocess.TimeoutExpired:
+            return {'status': 'timeout', 'detail': f"exceeded {options['timeout'] * 2 + 1}s wall time"}
+
+    if proc.returncode == 0:
+        return {'status': 'pass', 'detail': ''}
+    if proc.returncode < 0:
+        return {'status': 'killed', 'detail': f"signal {-proc.returncode} (CPU or memory limit)"}
+    detail = last_line(proc.stderr)
+    if 'MemoryError' in detail:
+        return {'status': 'killed', 'detail': 'MemoryError (memory limit)'}
+    return {'status': 'fail', 'detail': detail}
+
+
+class ResultCache:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.results = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.results = json.load(f)
+
+    def save(self, keys):
+        # Keep only blocks that still exist so the cache does not grow forever
+        self.results = {k: v for k, v in self.results.items() if k in keys}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def run_all(blocks, options, cache, workers):
+    """
+    Run uncached blocks on a worker pool; returns [(block, result, cached)].
+
+    Only results in CACHEABLE_STATUSES are stored, so a block that timed
+    out or was killed on a busy machine is run again next time.
+    """
+    keys = [block_key(block, options) for block in blocks]
+    # Caches written before timeouts were excluded may still hold some; re-run those too
+    pending = [
+        (block, key) for block, key in zip(blocks, keys)
+        if cache.results.get(key, {}).get('status') not in CACHEABLE_STATUSES
+    ]
+
+    fresh = {}
+    # Threads only wait on subprocesses, so they run in parallel
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (block, key), result in zip(pending, pool.map(lambda bk: run_block(bk[0], options), pending)):
+            fresh[key] = result
+            if result['status'] in CACHEABLE_STATUSES:
+                cache.results[key] = result
+            else:
+                cache.results.pop(key, None)
+
+    cache.save(set(keys))
+    return [
+        (block, fresh[key], False) if key in fresh else (block, cache.results[key], True)
+        for block, key in zip(blocks, keys)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile and run Python code blocks from a manuscript in sandboxed workers"
+    )
+    parser.add_argument('filepath', help='Manuscript markdown file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Parallel workers (default: CPU count)')
+    parser.add_argument('--timeout', type=int, default=10, help='CPU seconds per block (default: 10)')
+    parser.add_argument('--memory-mb', type=int, default=512, help='Address space limit per block in MB (default: 512)')
+    parser.add_argument('--compile-only', action='store_true', help='Only check that blocks compile')
+    parser.add_argument('--failures-only', action='store_true', help='Only list blocks that did not pass')
+    parser.add_argument('--cache', help='Result cache file (default: outputs/.code_block_results.json)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-run every block')
+
+    args = parser.parse_args()
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    cache = ResultCache(args.cache or workspace / 'outputs' / '.code_block_results.json')
+    if args.no_cache:
+        cache.results = {}
+
+    options = {'timeout': args.timeout, 'memory_mb': args.memory_mb, 'compile_only': args.compile_only}
+    blocks = [b for b in extract_code_blocks_with_headers(args.filepath) if b['language'] == 'python']
+    print(f"Found {len(blocks)} Python code blocks")
+
+    results = run_all(blocks, options, cache, args.workers)
+
+    counts = {}
+    ok = {'pass', 'compiled'}
+    for block, result, cached in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        if args.failures_only and result['status'] in ok:
+            continue
+        note = ' (cached)' if cached else ''
+        print(f"\n[{result['status'].upper()}]{note} lines {block['start_line']}-{block['end_line']}: {block['heading_path']}")
+        if result['detail']:
+            print(f"    {result['detail']}")
+
+    reused = sum(1 for _, _, cached in results if cached)
+    print("\n" + "=" * 80)
+    print(f"Ran {len(results) - reused} block(s), reused {reused} cached result(s)")
+    for status, count in sorted(counts.items()):
+        print(f"  {status}: {count}")
+
+    return 0 if all(result['status'] in ok for _, result, _ in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Full-text search over research notes and persona resources.
+
+Markdown and PDF text is extracted once into a SQLite FTS5 index stored in
+outputs/.search_index.db. Each run re-extracts only files whose contents
+changed, so queries over hundreds of notes return ranked file/heading/line
+hits in milliseconds instead of grepping every file.
+
+Usage:
+    python scripts/search_index.py update
+    python scripts/search_index.py query "error budget"
+    python scripts/search_index.py query '"black swan" AND postmortem' --limit 20
+    python scripts/search_index.py query 'NEAR(budget burn, 5)' --raw
+    python scripts/search_index.py stats
+"""
+
+import argparse
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+from analyze_code_blocks import split_sections
+from hashing import hash_file
+
+try:
+    import pypdf
+except ImportError:  # PDFs are read with pdftotext if available, else skipped
+    pypdf = None
+
+# Errors a damaged or unsupported PDF can raise while its text is extracted
+PDF_ERRORS = (OSError, ValueError, subprocess.CalledProcessError)
+if pypdf is not None:
+    PDF_ERRORS += (pypdf.errors.PyPdfError,)
+
+FTS_OPERATORS = {'AND', 'OR', 'NOT'}
+# "a phrase" (closing quote optional), a parenthesis, or a bare word
+QUERY_TOKEN_PATTERN = re.compile(r'"(?P<phrase>[^"]*)"?|(?P<paren>[()])|(?P<word>[^\s()"]+)')
+
+DEFAULT_SOURCES = [
+    "outputs/research/*.md",
+    "persona/*.md",
+    "persona/resources/*.md",
+    "persona/resources/*.pdf",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha256 TEXT,
+    passages INTEGER
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text,
+    path UNINDEXED,
+    heading UNINDEXED,
+    line UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def markdown_passages(text):
+    """Yield (heading path, first line, text) for each paragraph of a markdown file."""
+    for section in split_sections(text.split('\n')):
+        paragraph = []
+        start = section['start_line']
+        for i, line in enumerate(section['lines'], section['start_line']):
+            if line.strip():
+                if not paragraph:
+                    start = i
+                paragraph.append(line)
+            elif paragraph:
+                yield section['heading_path'], start, '\n'.join(paragraph)
+                paragraph = []
+        if paragraph:
+            yield section['heading_path'], start, '\n'.join(paragraph)
+
+
+def can_extract_pdf():
+    return pypdf is not None or shutil.which('pdftotext') is not None
+
+
+def pdf_pages(path):
+    """Return the text of each PDF page, or None if no extractor is installed."""
+    if pypdf is not None:
+        reader = pypdf.PdfReader(str(path))
+        return [page.extract_text() or '' for page in reader.pages]
+    if shutil.which('pdftotext'):
+        result = subprocess.run(
+            ['pdftotext', '-layout', str(path), '-'],
+            capture_output=True, text=True, check=True
+        )
+        return result.stdout.split('\f')
+    return None
+
+
+def pdf_passages(path):
+    pages = pdf_pages(path)
+    if pages is None:
+        return None
+    passages = []
+    for number, page in enumerate(pages, 1):
+        for heading, line, text in markdown_passages(page):
+            passages.append((f"page {number}", line, text))
+    return passages
+
+
+def fts_query(text):
+    """
+    Turn a search string into an FTS5 expression.
+
+    Words and "phrases" are quoted, so punctuation such as on-call or SLO's
+    is matched as text instead of being read as FTS5 syntax. A trailing *
+    still makes a prefix search. AND/OR/NOT (upper case) and parentheses
+    are kept as operators only when the string uses one of the operators.
+    """
+    tokens = list(QUERY_TOKEN_PATTERN.finditer(text))
+    operators = any(t.group('word') in FTS_OPERATORS for t in tokens)
+    terms = []
+    for token in tokens:
+        word = token.group('word')
+        if token.group('paren'):
+            if operators:
+                terms.append(token.group('paren'))
+        elif word is None:
+            terms.append('"' + token.group('phrase') + '"')
+        elif operators and word in FTS_OPERATORS:
+            terms.append(word)
+        elif word.endswith('*') and word.strip('*'):
+            terms.append('"' + word.rstrip('*').replace('"', '""') + '"*')
+        else:
+            terms.append('"' + word.replace('"', '""') + '"')
+    return ' '.join(terms)
+
+
+class SearchIndex:
+    def __init__(self, db_path, root):
+        self.root = Path(root)
+        self.db = sqlite3.connect(str(db_path))
+        try:
+            self.db.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"SQLite FTS5 is required for the search index: {e}")
+
+    def close(self):
+        self.db.close()
+
+    def collect(self, patterns):
+        files = set()
+        for pattern in patterns:
+            files.update(p for p in self.root.glob(pattern) if p.is_file())
+        return sorted(files)
+
+    def update(self, patterns=DEFAULT_SOURCES):
+        """
+        Bring the index in line with the files matching patterns.
+
+        Files are re-extracted only when size or mtime changed and the
+        content hash differs. PDFs that cannot be read yet (no extractor
+        installed) are recorded without a hash and retried once one is;
+        PDFs the extractor fails on are recorded with no passages and
+        retried when they change.
+        Returns (indexed, removed, newly skipped) lists; skipped entries
+        are (path, reason) pairs.
+        """
+        pdf_ok = can_extract_pdf()
+        known = {row[0]: row[1:] for row in self.db.execute("SELECT path, mtime_ns, size, sha256 FROM files")}
+        indexed, skipped = [], []
+        seen = set()
+
+        with self.db:
+            for path in self.collect(patterns):
+                rel = str(path.relative_to(self.root))
+                seen.add(rel)
+                stat = path.stat()
+                previous = known.get(rel)
+                if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size \
+                        and (previous[2] is not None or not pdf_ok):
+                    continue
+
+                sha = hash_file(path)
+                if previous and previous[2] == sha:
+                    self.db.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                                    (stat.st_mtime_ns, stat.st_size, rel))
+                    continue
+
+                if path.suffix.lower() == '.pdf':
+                    try:
+                        passages = pdf_passages(path)
+                    except PDF_ERRORS as e:
+                        # Keep the hash so an unchanged, unreadable PDF is not retried every run
+                        self.db.execute("DELETE FROM passages WHERE path = ?", (rel,))
+                        self.db.execute(
+                            "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256, passages) VALUES (?, ?, ?, ?, 0)",
+                            (rel, stat.st_mtime_ns, stat.st_size, sha)
+                        )
+                        skipped.append((rel, f"could not extract text ({type(e).__name__}: {e})"))
+                        continue
+                    if passages is None:
+                        self.db.execute(
+                            "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256, passages) VALUES (?, ?, ?, NULL, 0)",
+                            (rel, stat.st_mtime_ns, stat.st_size)
+                        )
+                        skipped.append((rel, "install pypdf or pdftotext to index PDFs"))
+                        continue
+                else:
+                    passages = list(markdown_passages(path.read_text(encoding='utf-8', errors='replace')))
+
+                self.db.execute("DELETE FROM passages WHERE path = ?", (rel,))
+                self.db.executemany(
+                    "INSERT INTO passages (text, path, heading, line) VALUES (?, ?, ?, ?)",
+                    [(text, rel, heading, line) for heading, line, text in passages]
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256, passages) VALUES (?, ?, ?, ?, ?)",
+                    (rel, stat.st_mtime_ns, stat.st_size, sha, len(passages))
+                )
+                indexed.append(rel)
+
+            removed = [rel for rel in known if rel not in seen]
+            for rel in removed:
+                self.db.execute("DELETE FROM passages WHERE path = ?", (rel,))
+                self.db.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+        return indexed, removed, skipped
+
+    def query(self, query, limit=10, raw=False):
+        """
+        Ranked hits for a search string.
+
+        Plain words match anywhere in a passage; "quoted words" match as a
+        phrase; AND/OR/NOT and prefix* are supported. With raw, query is
+        passed to FTS5 MATCH unchanged.
+        """
+        if not raw:
+            query = fts_query(query)
+        rows = self.db.execute(
+            """
+            SELECT path, heading, line, snippet(passages, 0, '[', ']', '...', 16), bm25(passages)
+            FROM passages WHERE passages MATCH ?
+            ORDER BY bm25(passages) LIMIT ?
+            """,
+            (query, limit)
+        )
+        return [
+            {'path': path, 'heading': heading, 'line': line, 'snippet': snippet, 'score': -score}
+            for path, heading, line, snippet, score in rows
+        ]
+
+    def stats(self):
+        files, passages, unread = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(passages), 0), COUNT(*) - COUNT(sha256) FROM files"
+        ).fetchone()
+        return {'files': files, 'passages': passages, 'unread': unread}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index and search research notes and persona resources"
+    )
+    parser.add_argument(
+        '--source',
+        action='append',
+        help='Glob (relative to the workspace) of files to index, repeatable '
+             '(default: outputs/research/*.md, persona/*.md, persona/resources/*.md and *.pdf)'
+    )
+    parser.add_argument('--db', help='Index database (default: outputs/.search_index.db)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('update', help='Index new and changed files')
+
+    query_parser = subparsers.add_parser('query', help='Search the index')
+    query_parser.add_argument('query', help='Words, "a phrase", or an expression with AND/OR/NOT')
+    query_parser.add_argument('--limit', type=int, default=10, help='Maximum hits (default: 10)')
+    query_parser.add_argument('--raw', action='store_true', help='Pass the query to FTS5 MATCH unchanged')
+    query_parser.add_argument('--no-update', action='store_true', help='Skip the incremental update before searching')
+
+    subparsers.add_parser('stats', help='Show index size')
+
+    args = parser.parse_args()
+
+    # Get workspace root (parent of scripts/)
+    workspace = Path(__file__).parent.parent
+    db_path = Path(args.db) if args.db else workspace / 'outputs' / '.search_index.db'
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    sources = args.source or DEFAULT_SOURCES
+
+    try:
+        index = SearchIndex(db_path, workspace)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == 'update' or (args.command == 'query' and not args.no_update):
+            indexed, removed, skipped = index.update(sources)
+            if args.command == 'update' or indexed or removed:
+                print(f"Indexed {len(indexed)} file(s), removed {len(removed)}", file=sys.stderr)
+            for rel, reason in skipped:
+                print(f"  Skipped {rel}: {reason}", file=sys.stderr)
+
+        if args.command == 'query':
+            try:
+                hits = index.query(args.query, args.limit, args.raw)
+            except sqlite3.OperationalError as e:
+                print(f"Error: invalid query: {e}", file=sys.stderr)
+                return 1
+            if not hits:
+                print(f"No matches for: {args.query}")
+            for hit in hits:
+                print(f"{hit['path']}:{hit['line']}  [{hit['heading']}]")
+                print(f"    {' '.join(hit['snippet'].split())}")
+
+        elif args.command == 'stats':
+            s = index.stats()
+            print(f"Files: {s['files']}  Passages: {s['passages']}  Database: {db_path.stat().st_size / 1024:.1f} KB")
+            if s['unread']:
+                print(f"PDFs not yet indexed: {s['unread']} (install pypdf or pdftotext)")
+    finally:
+        index.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
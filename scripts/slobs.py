@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the book scripts.
+
+Each subcommand runs an existing script's main(). A script's module (and
+whatever it imports) is only loaded when its subcommand runs, so
+`slobs --help` and quick commands called from hooks start in a few tens
+of milliseconds instead of paying for numpy, Pillow or pandoc every time.
+
+Usage:
+    python scripts/slobs.py --help
+    python scripts/slobs.py lint agents/*.mdc
+    python scripts/slobs.py stage --chapter 5
+    python scripts/slobs.py cost --log outputs/usage/usage.jsonl
+
+    # Shorter, from the workspace root
+    alias slobs="python3 $PWD/scripts/slobs.py"
+"""
+
+import importlib
+import sys
+import time
+
+# Subcommand -> (module in scripts/, summary). Modules are imported lazily.
+COMMANDS = {
+    "lint": ("validate_mdc", "Validate agent .mdc files"),
+    "analyze": ("analyze_code_blocks", "Analyze manuscript code blocks for issues"),
+    "lines": ("check_line_lengths", "Find code lines over the length limit"),
+    "links": ("check_links", "Check Markdown links, anchors and images"),
+    "run-blocks": ("run_code_blocks", "Compile and run Python code blocks"),
+    "index": ("manuscript_index", "Query the indexed manuscript structure"),
+    "diff": ("diff_manuscript", "Show sections changed since a manuscript version"),
+    "headers": ("post_process_markdown_headers", "Shift Markdown heading levels"),
+    "chunk": ("chunk_manuscript", "Split a manuscript to fit a context window"),
+    "stage": ("organize_outputs", "Organize outputs for Scrivener import"),
+    "images": ("optimize_images", "Deduplicate and optimize images"),
+    "convert": ("convert_to_rtf", "Convert Markdown to RTF (needs pandoc)"),
+    "drafts": ("draft_store", "Deduplicated draft version store"),
+    "search": ("search_index", "Full-text search of research notes"),
+    "agents": ("orchestrate_agents", "Run agent jobs concurrently"),
+    "cache": ("agent_cache", "Agent output cache"),
+    "cost": ("cost_tracker", "Estimate and report API costs"),
+    "bench": ("benchmark", "Benchmark the scripts on synthetic books"),
+}
+
+
+def print_help():
+    print("usage: slobs [--timing] <command> [args...]\n")
+    print("Run `slobs <command> --help` for a command's options.\n")
+    print("commands:")
+    for name, (module, summary) in COMMANDS.items():
+        print(f"  {name:<12} {summary} ({module}.py)")
+    print("\noptions:")
+    print("  --timing     print import and run time of the command to stderr")
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    timing = "--timing" in argv[:1]
+    if timing:
+        argv = argv[1:]
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print_help()
+        return 0
+
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"slobs: unknown command '{name}' (see slobs --help)", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    module = importlib.import_module(COMMANDS[name][0])
+    imported = time.perf_counter()
+
+    # The script's argparse reads sys.argv; argv[0] makes its usage read "slobs <command>"
+    sys.argv = [f"slobs {name}", *args]
+    try:
+        result = module.main()
+    except SystemExit as e:
+        result = e.code
+    finally:
+        if timing:
+            print(f"slobs {name}: import {(imported - started) * 1000:.1f} ms, "
+                  f"run {(time.perf_counter() - imported) * 1000:.1f} ms", file=sys.stderr)
+
+    # Scripts return an exit code, None, or exit themselves
+    return result or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
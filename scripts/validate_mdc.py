@@ -4,11 +4,14 @@ Validator for .mdc files
 Checks YAML frontmatter syntax and markdown structure
 """
 
+import argparse
 import re
 import sys
 from pathlib import Path
 from typing import List, Tuple, Dict
 
+from profiling import PROFILER, add_profile_arguments, start_profiling, finish_profiling
+
 def extract_frontmatter(content: str) -> Tuple[str, str, str]:
     """Extract YAML frontmatter and markdown content.
     
@@ -138,52 +141,61 @@ def validate_file(filepath: Path) -> Dict:
     }
     
     try:
-        content = filepath.read_text(encoding='utf-8')
+        with PROFILER.phase('read') as phase:
+            content = filepath.read_text(encoding='utf-8')
+            phase.nbytes = len(content)
     except Exception as e:
         results['valid'] = False
         results['errors'].append(f"Cannot read file: {e}")
         return results
     
     # Validate structure
-    structure_errors = validate_mdc_structure(content)
+    with PROFILER.phase('check:structure', nbytes=len(content)):
+        structure_errors = validate_mdc_structure(content)
     results['errors'].extend(structure_errors)
     
     # Extract and validate frontmatter
-    first_block, second_block, markdown = extract_frontmatter(content)
+    with PROFILER.phase('tokenize:frontmatter', nbytes=len(content)):
+        first_block, second_block, markdown = extract_frontmatter(content)
     
     # Combine both blocks for field checking
     combined_frontmatter = first_block + '\n' + second_block if first_block and second_block else (first_block or second_block)
     
     if first_block:
-        yaml_errors = validate_yaml_basic(first_block)
+        with PROFILER.phase('check:yaml', nbytes=len(first_block)):
+            yaml_errors = validate_yaml_basic(first_block)
         results['errors'].extend(yaml_errors)
     
     if second_block:
-        yaml_errors = validate_yaml_basic(second_block)
+        with PROFILER.phase('check:yaml', nbytes=len(second_block)):
+            yaml_errors = validate_yaml_basic(second_block)
         results['errors'].extend(yaml_errors)
         
         # Check for required fields in second block
-        required_fields = ['name', 'model', 'description']
-        for field in required_fields:
-            if field + ':' not in second_block:
-                results['errors'].append(f"Missing required YAML field in metadata block: '{field}'")
+        with PROFILER.phase('check:required_fields'):
+            required_fields = ['name', 'model', 'description']
+            for field in required_fields:
+                if field + ':' not in second_block:
+                    results['errors'].append(f"Missing required YAML field in metadata block: '{field}'")
     
     # Validate markdown code blocks
-    code_block_errors = validate_markdown_code_blocks(markdown)
+    with PROFILER.phase('check:code_blocks', nbytes=len(markdown)):
+        code_block_errors = validate_markdown_code_blocks(markdown)
     results['errors'].extend(code_block_errors)
     
     # Check for common issues
     if markdown:
-        # Check for unclosed inline code (but ignore properly closed ones)
-        # Count backticks - should be even for inline code
-        inline_backticks = len(re.findall(r'`', markdown))
-        # Subtract code block markers (each is 3 backticks)
-        code_block_backticks = len(re.findall(r'```', markdown)) * 3
-        remaining_backticks = inline_backticks - code_block_backticks
-        
-        # If odd number of remaining backticks, might have unclosed inline code
-        if remaining_backticks % 2 != 0:
-            results['warnings'].append("Possible unclosed inline code backticks (odd count after code blocks)")
+        with PROFILER.phase('check:inline_backticks', nbytes=len(markdown)):
+            # Check for unclosed inline code (but ignore properly closed ones)
+            # Count backticks - should be even for inline code
+            inline_backticks = len(re.findall(r'`', markdown))
+            # Subtract code block markers (each is 3 backticks)
+            code_block_backticks = len(re.findall(r'```', markdown)) * 3
+            remaining_backticks = inline_backticks - code_block_backticks
+            
+            # If odd number of remaining backticks, might have unclosed inline code
+            if remaining_backticks % 2 != 0:
+                results['warnings'].append("Possible unclosed inline code backticks (odd count after code blocks)")
     
     if results['errors']:
         results['valid'] = False
@@ -192,8 +204,21 @@ def validate_file(filepath: Path) -> Dict:
 
 def main():
     """Main validation function."""
-    if len(sys.argv) > 1:
-        files_to_check = [Path(f) for f in sys.argv[1:]]
+    parser = argparse.ArgumentParser(
+        description="Validate .mdc agent files (frontmatter and markdown structure)"
+    )
+    parser.add_argument(
+        'files',
+        nargs='*',
+        help='.mdc files to validate (default: all files in agents/)'
+    )
+    add_profile_arguments(parser)
+    
+    args = parser.parse_args()
+    start_profiling(args)
+    
+    if args.files:
+        files_to_check = [Path(f) for f in args.files]
     else:
         # Find all .mdc files in agents directory
         agents_dir = Path(__file__).parent.parent / 'agents'
@@ -209,20 +234,22 @@ def main():
     for filepath in files_to_check:
         results = validate_file(filepath)
         
-        status = "✓ VALID" if results['valid'] else "✗ INVALID"
-        print(f"{status}: {results['file']}")
-        
-        if results['errors']:
-            all_valid = False
-            for error in results['errors']:
-                print(f"  ERROR: {error}")
-        
-        if results['warnings']:
-            for warning in results['warnings']:
-                print(f"  WARNING: {warning}")
-        
-        print()
+        with PROFILER.phase('report'):
+            status = "✓ VALID" if results['valid'] else "✗ INVALID"
+            print(f"{status}: {results['file']}")
+            
+            if results['errors']:
+                all_valid = False
+                for error in results['errors']:
+                    print(f"  ERROR: {error}")
+            
+            if results['warnings']:
+                for warning in results['warnings']:
+                    print(f"  WARNING: {warning}")
+            
+            print()
     
+    finish_profiling(args)
     return 0 if all_valid else 1
 
 if __name__ == '__main__':
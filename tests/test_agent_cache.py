@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from agent_cache import AgentCache  # noqa: E402
+
+
+def test_report_prices_request_and_token_models(tmp_path):
+    cache = AgentCache(tmp_path / "cache")
+    # A research entry that recorded token usage, as orchestrate_agents does
+    cache.put("a" * 64, "research notes", model="perplexity",
+              usage={"input_tokens": 1200, "output_tokens": 800})
+    cache.put("b" * 64, "more notes", model="perplexity", usage={"requests": 3})
+    cache.put("c" * 64, "critique", model="claude-sonnet-4",
+              usage={"input_tokens": 1_000_000, "output_tokens": 0})
+    cache.put("d" * 64, "draft", model="gpt-5.2", usage={"input_tokens": 100, "output_tokens": 10})
+    for key in "abcd":
+        assert cache.get(key * 64) is not None
+
+    report = cache.report()
+
+    assert report["hits"] == 4
+    # One request for the token-only entry, three for the other
+    assert report["saved"]["breakdown"]["perplexity"] == pytest.approx(0.02)
+    assert report["saved"]["breakdown"]["claude-sonnet-4"] == pytest.approx(3.00)
+    assert report["saved"]["total"] == pytest.approx(3.02)
+    assert report["unpriced"] == {"gpt-5.2": {"input_tokens": 100, "output_tokens": 10, "requests": 1}}
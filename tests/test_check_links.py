@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from check_links import slugify  # noqa: E402
+
+
+@pytest.mark.parametrize("heading, slug", [
+    ("Error Budgets", "error-budgets"),
+    ("What's an SLO?", "whats-an-slo"),
+    ("The error_budget_policy field", "the-error_budget_policy-field"),
+    ("Calling `get_threshold()`", "calling-get_threshold"),
+    ("`_private` helpers", "_private-helpers"),
+    ("`List<int>` results", "listint-results"),
+    ("**Bold** and _emphasis_", "bold-and-emphasis"),
+    ("See [the guide](guide.md)", "see-the-guide"),
+    ("~~Old~~ <em>new</em>", "old-new"),
+])
+def test_slugify(heading, slug):
+    assert slugify(heading) == slug
@@ -0,0 +1,41 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from cost_tracker import CostTracker  # noqa: E402
+
+
+def test_mixed_unit_records_are_priced_by_the_model_units(tmp_path):
+    log = tmp_path / "usage.jsonl"
+    records = [
+        # Request-priced model that also reports tokens
+        {"model": "perplexity", "input_tokens": 1200, "output_tokens": 800, "requests": 2,
+         "timestamp": "2025-11-20T10:00:00", "chapter": "5"},
+        # Token-priced model with only a request count
+        {"model": "claude-sonnet-4", "requests": 3, "timestamp": "2025-11-20T11:00:00"},
+        {"model": "claude-sonnet-4", "input_tokens": 1_000_000, "timestamp": "2025-11-20T12:00:00"},
+    ]
+    log.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    tracker = CostTracker()
+    assert tracker.ingest_log(log) == 3
+    assert tracker.ledger["skipped"] == 0
+
+    by_model = tracker.ledger["by_model"]
+    assert by_model["perplexity"]["input_tokens"] == 1200
+    assert by_model["perplexity"]["output_tokens"] == 800
+    assert by_model["perplexity"]["requests"] == 2
+    assert by_model["perplexity"]["cost"] == pytest.approx(0.01)
+    assert by_model["claude-sonnet-4"]["requests"] == 4
+    assert by_model["claude-sonnet-4"]["cost"] == pytest.approx(3.00)
+
+
+def test_cost_for_treats_missing_units_as_zero():
+    tracker = CostTracker()
+    assert tracker.cost_for("gpt-4o", {"output_tokens": 1_000_000}) == pytest.approx(15.00)
+    assert tracker.cost_for("perplexity", {"input_tokens": 5000}) == 0
+    assert tracker.cost_for("unknown-model", {"requests": 10}) == 0
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS = Path(__file__).parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+from draft_store import DraftStore  # noqa: E402
+
+
+def run_store(store, *args):
+    return subprocess.run(
+        [sys.executable, str(SCRIPTS / "draft_store.py"), "--store", str(store), *args],
+        capture_output=True, text=True
+    )
+
+
+def test_same_version_different_names_are_not_overwritten(tmp_path):
+    drafts = tmp_path / "drafts"
+    drafts.mkdir()
+    (drafts / "draft_5_intro_v1.md").write_text("# Intro\n\nfirst\n")
+    (drafts / "draft_5_intro_v2.md").write_text("# Intro\n\nsecond\n")
+    (drafts / "draft_5_intro.v2.md").write_text("# Intro\n\nsecond, post-processed\n")
+    (drafts / "draft_5_intro_v3.md").write_text("# Intro\n\nthird\n")
+    store_dir = tmp_path / "store"
+
+    result = run_store(store_dir, "add", str(drafts), "--remove-originals")
+
+    assert result.returncode == 1
+    assert "already archived" in result.stderr
+    # The file that could not be archived is left on disk
+    remaining = sorted(p.name for p in drafts.iterdir())
+    assert "draft_5_intro_v3.md" in remaining
+    assert len([n for n in remaining if "v2" in n]) == 1
+
+    store = DraftStore(store_dir)
+    archived = store.materialize("draft_5_intro", 2).decode()
+    kept = next(p for p in drafts.iterdir() if "v2" in p.name).read_text()
+    assert archived != kept
+    assert {archived, kept} == {"# Intro\n\nsecond\n", "# Intro\n\nsecond, post-processed\n"}
+
+
+def test_remove_originals_keeps_files_changed_since_archiving(tmp_path):
+    drafts = tmp_path / "drafts"
+    drafts.mkdir()
+    v1 = drafts / "draft_1_a_v1.md"
+    v1.write_text("one\n")
+    (drafts / "draft_1_a_v2.md").write_text("two\n")
+    store_dir = tmp_path / "store"
+    assert run_store(store_dir, "add", str(drafts)).returncode == 0
+
+    v1.write_text("one, edited\n")
+    result = run_store(store_dir, "add", str(drafts), "--remove-originals")
+
+    assert result.returncode == 1
+    assert v1.exists()
+    assert DraftStore(store_dir).materialize("draft_1_a", 1) == b"one\n"
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from analyze_code_blocks import extract_code_blocks_from_lines, split_sections  # noqa: E402
+from manuscript_index import section_code_blocks  # noqa: E402
+
+
+def test_section_starting_with_a_fence():
+    lines = [
+        "```python",
+        "# not a heading",
+        "x = 1",
+        "```",
+        "",
+        "# Chapter",
+        "```bash",
+        "echo hi",
+        "```",
+    ]
+    sections = split_sections(lines)
+    assert sections[0]['lines'][0] == "```python"
+
+    blocks = [block for section in sections for block in section_code_blocks(section)]
+
+    assert blocks == extract_code_blocks_from_lines(lines)
+    assert [(b['start_line'], b['end_line'], b['heading_path']) for b in blocks] == \
+        [(1, 4, 'No heading'), (7, 9, 'Chapter')]
+    assert blocks[0]['content'] == "# not a heading\nx = 1"
+
+
+def test_section_inside_an_unclosed_fence():
+    section = {'heading_path': 'No heading', 'level': 0, 'start_line': 10,
+               'lines': ["print('tail of a block')", "```"]}
+    blocks = section_code_blocks(section)
+    assert blocks == []
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import random
+import shutil
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from agent_cache import AgentCache  # noqa: E402
+from orchestrate_agents import (  # noqa: E402
+    DEFAULT_PROVIDERS, FakeProviderHandler, Orchestrator, Provider, load_agents
+)
+
+
+class RecordingHandler(FakeProviderHandler):
+    """Fake provider that records requests and can reject the first ones."""
+    received = []
+    reject = []  # HTTP status codes for the next requests, consumed in order
+    lock = threading.Lock()
+
+    def do_POST(self):
+        with self.lock:
+            status = self.reject.pop(0) if self.reject else None
+        if status:
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_response(status)
+            self.end_headers()
+            self.wfile.write(b'{"error": "rejected"}')
+            return
+        # Read the body here to record it, then let the fake answer
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        with self.lock:
+            self.received.append(json.loads(body))
+        self.rfile = _Replay(body)
+        super().do_POST()
+
+
+class _Replay:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, n=-1):
+        return self.data
+
+
+@pytest.fixture
+def fake_url():
+    RecordingHandler.received = []
+    RecordingHandler.reject = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    shutil.copytree(ROOT / "agents", tmp_path / "agents")
+    return tmp_path
+
+
+def run_jobs(workspace, url, jobs, cache=None, retries=2, max_concurrency=8):
+    async def run():
+        providers = {name: Provider(name, config, url, retries) for name, config in DEFAULT_PROVIDERS.items()}
+        orchestrator = Orchestrator(workspace, load_agents(workspace / "agents"), providers,
+                                    max_concurrency, cache)
+        return await orchestrator.run([dict(job) for job in jobs])
+    return asyncio.run(run())
+
+
+def user_message(request):
+    return request['messages'][-1]['content']
+
+
+JOBS = [
+    {"id": "notes", "agent": "research", "topic": "black_swans", "prompt": "Find black swan incidents"},
+    {"id": "budgets", "agent": "research", "topic": "error_budgets", "prompt": "Explain error budgets"},
+    {"id": "draft", "agent": "writing", "chapter": "5", "section": "intro",
+     "prompt": "Draft the intro", "after": ["notes"]},
+    {"id": "critique", "agent": "critique", "chapter": "5", "section": "intro", "after": ["draft"]},
+    {"id": "critique2", "agent": "critique", "chapter": "5", "section": "intro", "after": ["draft"]},
+]
+
+
+def test_jobs_wait_for_their_dependencies(workspace, fake_url):
+    results = run_jobs(workspace, fake_url, JOBS)
+
+    assert not [r for r in results.values() if isinstance(r, BaseException)]
+    order = [user_message(r) for r in RecordingHandler.received]
+    notes = order.index("Find black swan incidents")
+    draft = next(i for i, p in enumerate(order) if p.startswith("Draft the intro"))
+    critiques = [i for i, p in enumerate(order) if not p.startswith(("Draft", "Find", "Explain"))]
+    assert notes < draft
+    assert len(critiques) == 2 and all(draft < i for i in critiques)
+    # Upstream outputs are passed on as inputs
+    assert results["notes"].name in order[draft]
+    assert all(results["draft"].name in order[i] for i in critiques)
+
+    # Jobs that would get the same name in the same minute get distinct files
+    paths = list(results.values())
+    assert len(set(paths)) == len(paths)
+    assert results["draft"].name == "draft_5_intro_v1.md"
+
+
+def test_cache_keys_include_the_prompt(workspace, fake_url):
+    cache = AgentCache(workspace / "outputs" / "cache")
+    first = run_jobs(workspace, fake_url, JOBS[:2], cache=cache)
+    assert len(RecordingHandler.received) == 2
+    assert first["notes"].read_text() != first["budgets"].read_text()
+
+    second = run_jobs(workspace, fake_url, JOBS[:2], cache=AgentCache(workspace / "outputs" / "cache"))
+    assert len(RecordingHandler.received) == 2
+    assert second["notes"].read_text() == first["notes"].read_text()
+    assert second["budgets"].read_text() == first["budgets"].read_text()
+
+    changed = dict(JOBS[1], prompt="Explain burn rate alerts")
+    run_jobs(workspace, fake_url, [changed], cache=AgentCache(workspace / "outputs" / "cache"))
+    assert len(RecordingHandler.received) == 3
+
+
+def test_rate_limited_calls_are_retried(workspace, fake_url, monkeypatch):
+    monkeypatch.setattr(random, "random", lambda: 0.0)  # Shortest backoff
+    RecordingHandler.reject = [429, 503]
+
+    results = run_jobs(workspace, fake_url, JOBS[:1], retries=2)
+
+    assert results["notes"].exists()
+    assert len(RecordingHandler.received) == 1
+    usage = [json.loads(line) for line in (workspace / "outputs" / "usage" / "usage.jsonl").read_text().splitlines()]
+    assert len(usage) == 1 and usage[0]["model"] == "perplexity" and usage[0]["input_tokens"] > 0
+
+
+def test_client_errors_and_exhausted_retries_fail_the_job(workspace, fake_url, monkeypatch):
+    monkeypatch.setattr(random, "random", lambda: 0.0)
+    RecordingHandler.reject = [400]
+    results = run_jobs(workspace, fake_url, JOBS[:1], retries=2)
+    assert isinstance(results["notes"], Exception) and "HTTP 400" in str(results["notes"])
+
+    RecordingHandler.reject = [429, 429]
+    results = run_jobs(workspace, fake_url, JOBS[:1], retries=1)
+    assert isinstance(results["notes"], Exception) and "HTTP 429" in str(results["notes"])
+    assert RecordingHandler.received == []
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import run_code_blocks  # noqa: E402
+from run_code_blocks import ResultCache, run_all  # noqa: E402
+
+OPTIONS = {'timeout': 1, 'memory_mb': 0, 'compile_only': False}
+
+
+def block(content, start_line=1):
+    return {'content': content, 'start_line': start_line, 'end_line': start_line + 2}
+
+
+def test_timeouts_are_rerun_and_deterministic_results_cached(tmp_path, monkeypatch):
+    outcomes = {'slow()': ['timeout', 'pass'], 'ok()': ['pass'], 'bad()': ['fail']}
+    calls = []
+
+    def fake_run_block(b, options):
+        calls.append(b['content'])
+        return {'status': outcomes[b['content']].pop(0), 'detail': ''}
+
+    monkeypatch.setattr(run_code_blocks, 'run_block', fake_run_block)
+    blocks = [block('slow()', 1), block('ok()', 5), block('bad()', 9)]
+    cache_path = tmp_path / 'results.json'
+
+    first = run_all(blocks, OPTIONS, ResultCache(cache_path), workers=2)
+    assert [(r['status'], cached) for _, r, cached in first] == \
+        [('timeout', False), ('pass', False), ('fail', False)]
+
+    calls.clear()
+    second = run_all(blocks, OPTIONS, ResultCache(cache_path), workers=2)
+    assert calls == ['slow()']
+    assert [(r['status'], cached) for _, r, cached in second] == \
+        [('pass', False), ('pass', True), ('fail', True)]
+
+
+def test_timeout_from_a_real_run_is_not_cached(tmp_path):
+    cache = ResultCache(tmp_path / 'results.json')
+    results = run_all([block('while True:\n    pass')], OPTIONS, cache, workers=1)
+    assert results[0][1]['status'] in ('timeout', 'killed')
+    assert ResultCache(tmp_path / 'results.json').results == {}
+
+
+def test_cached_timeouts_from_older_runs_are_rerun(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_code_blocks, 'run_block', lambda b, options: {'status': 'pass', 'detail': ''})
+    b = block('slow()')
+    cache = ResultCache(tmp_path / 'results.json')
+    cache.results[run_code_blocks.block_key(b, OPTIONS)] = {'status': 'timeout', 'detail': ''}
+
+    results = run_all([b], OPTIONS, cache, workers=1)
+    assert [(r['status'], cached) for _, r, cached in results] == [('pass', False)]